@@ -0,0 +1,151 @@
+"""Асинхронные версии нагруженных эндпоинтов чтения.
+
+Подключаются в api/urls.py, когда проект запущен в режиме ASGI
+(SERVER_MODE=asgi). GET-запросы обрабатываются корутинами поверх
+async ORM, остальные методы передаются обычным вьюсетам DRF.
+Аутентификация, права, ограничения частоты и обработка ошибок
+выполняются вьюсетами DRF, как в синхронных версиях, поэтому ответы
+совпадают.
+"""
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.settings import api_settings
+
+from asgiref.sync import sync_to_async
+from functools import wraps
+from workouts.models import TrainingPlan
+
+from diets.models import DietPlan
+
+from .pagination import KeysetPagination
+from .serializers import (ClientListSerializer, ClientProfileSerializer,
+                          DietListSerializer, WorkoutListSerializer,)
+from .views import (ClientsViewSet, CustomUserViewSet, DietPlanViewSet,
+                    TrainingPlanViewSet,)
+
+
+def render(data, status=200, headers=None):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(
+        renderer.render(data),
+        content_type=renderer.media_type,
+        status=status,
+        headers=headers,
+    )
+
+
+def get_action_view(viewset, actions):
+    """as_view вьюсета с параметрами @action, как у роутера."""
+    action = getattr(viewset, actions["get"])
+    return viewset.as_view(actions, **getattr(action, "kwargs", {}))
+
+
+def async_read_view(sync_view):
+    """Декоратор корутины, обрабатывающей GET вместо sync_view.
+
+    Перед корутиной выполняются проверки sync_view (APIView.initial):
+    аутентификация, права и ограничения частоты. Корутина получает
+    экземпляр вьюсета с Request DRF и возвращает данные ответа.
+    Исключения, в том числе Http404 и PermissionDenied Django,
+    обрабатывает handle_exception вьюсета.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method != "GET":
+                return await sync_to_async(sync_view)(
+                    request, *args, **kwargs
+                )
+            viewset = sync_view.cls(**sync_view.initkwargs)
+            viewset.action_map = sync_view.actions
+            viewset.args, viewset.kwargs = args, kwargs
+            viewset.request = viewset.initialize_request(
+                request, *args, **kwargs
+            )
+            viewset.headers = viewset.default_response_headers
+            try:
+                await sync_to_async(viewset.initial)(
+                    viewset.request, *args, **kwargs
+                )
+                if not viewset.request.user.is_authenticated:
+                    raise NotAuthenticated()
+                data = await handler(viewset, *args, **kwargs)
+            except Exception as exc:
+                response = await sync_to_async(viewset.handle_exception)(
+                    exc
+                )
+                headers = {
+                    header: value for header, value in response.items()
+                    if header != "Content-Type"
+                }
+                return render(response.data, response.status_code, headers)
+            return render(data)
+
+        view.csrf_exempt = True
+        return view
+
+    return decorator
+
+
+async def paginate(queryset, request, view, serializer_class):
+    """Страница keyset-пагинации с порядком сортировки вьюсета view."""
+    paginator = KeysetPagination()
+    rows = paginator.get_page_queryset(queryset, request, view)
+    page = paginator.set_page([row async for row in rows])
+    data = serializer_class(page, many=True).data
+    return paginator.get_paginated_response(data).data
+
+
+@async_read_view(
+    get_action_view(CustomUserViewSet, {"get": "get_workout_programs"})
+)
+async def workout_programs(viewset):
+    request = viewset.request
+    programs = TrainingPlan.objects.filter(user=request.user)
+    return await paginate(
+        programs, request, TrainingPlanViewSet, WorkoutListSerializer
+    )
+
+
+@async_read_view(
+    get_action_view(CustomUserViewSet, {"get": "get_diet_programs"})
+)
+async def diet_programs(viewset):
+    request = viewset.request
+    programs = DietPlan.objects.filter(user=request.user)
+    return await paginate(
+        programs, request, DietPlanViewSet, DietListSerializer
+    )
+
+
+@async_read_view(ClientsViewSet.as_view({"get": "list", "post": "create"}))
+async def clients_list(viewset):
+    return await paginate(
+        viewset.get_queryset(), viewset.request, ClientsViewSet,
+        ClientListSerializer,
+    )
+
+
+@async_read_view(
+    ClientsViewSet.as_view(
+        {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        }
+    )
+)
+async def client_detail(viewset, pk):
+    # В Django 4.2 async-итерация не поддерживает prefetch_related,
+    # поэтому карточка клиента загружается в потоке.
+    def get_profile():
+        client = get_object_or_404(viewset.get_queryset(), id=pk)
+        viewset.check_object_permissions(viewset.request, client)
+        return ClientProfileSerializer(
+            client, context={"request": viewset.request}
+        ).data
+
+    return await sync_to_async(get_profile)()
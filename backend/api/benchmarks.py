@@ -0,0 +1,377 @@
+"""Данные и сценарии для команды bench_api.
+
+Сценарий — функция без аргументов, выполняющая один запрос к API
+или одну сериализацию. Данные создаются в транзакции, которую команда
+откатывает после замеров, поэтому сценарии записи можно повторять.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+import datetime
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+
+from urllib.parse import urlencode
+from users.models import Params, SpecialistClient
+from users.params import refresh_current_params
+from workouts.models import (Exercise, ExerciseMuscleGroup, MuscleGroup,
+                             Training, TrainingPlan, TrainingPlanTraining,
+                             TrainingType,)
+
+from diets.models import DietPlan, DietPlanDiet, Diets, Meals, Products
+
+from .serializers import (ClientListSerializer, ClientProfileSerializer,
+                          CustomUserSerializer, DietPlanSerializer,
+                          ParamsSerializer, TrainingPlanSerializer,)
+
+User = get_user_model()
+
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench-api",
+    }
+}
+SEED_BATCH_SIZE = 2000
+WEEKDAYS = [str(day) for day in range(1, 8)]
+
+
+def bulk_create(objects):
+    if objects:
+        type(objects[0]).objects.bulk_create(
+            objects, batch_size=SEED_BATCH_SIZE
+        )
+    return objects
+
+
+def populate_plans(clients, links, plans, days, rng):
+    training_plans, diet_plans = [], []
+    for client, link in zip(clients, links):
+        for number in range(plans):
+            training_plans.append(TrainingPlan(
+                specialist=link.specialist, user=client,
+                name=f"Тренировки {number}", describe="Описание плана",
+            ))
+            diet_plans.append(DietPlan(
+                specialist=link.specialist, user=client,
+                name=f"Питание {number}", describe="Описание плана",
+                kkal=rng.randint(1500, 3000),
+            ))
+    bulk_create(training_plans)
+    bulk_create(diet_plans)
+    trainings = bulk_create([
+        Training(weekday=WEEKDAYS[day % 7], spec_comment="Комментарий")
+        for _ in training_plans for day in range(days)
+    ])
+    diets = bulk_create([
+        Diets(weekday=WEEKDAYS[day % 7], spec_comment="Комментарий")
+        for _ in diet_plans for day in range(days)
+    ])
+    bulk_create([
+        TrainingPlanTraining(training_plan=plan, training=training)
+        for plan, training in zip(
+            (plan for plan in training_plans for _ in range(days)),
+            trainings,
+        )
+    ])
+    bulk_create([
+        DietPlanDiet(diet_plan=plan, diet=diet)
+        for plan, diet in zip(
+            (plan for plan in diet_plans for _ in range(days)), diets
+        )
+    ])
+    return training_plans, diet_plans
+
+
+def populate_params(clients, count, rng):
+    bulk_create([
+        Params(user=client, weight=rng.uniform(60, 90), height=180)
+        for client in clients for _ in range(count)
+    ])
+    # Для клиента из сценариев история растянута по дням, иначе у
+    # временного ряда была бы одна точка.
+    start = datetime.datetime.now(datetime.timezone.utc)
+    for days, params in enumerate(Params.objects.filter(user=clients[0])):
+        Params.objects.filter(pk=params.pk).update(
+            created_at=start - datetime.timedelta(days=days)
+        )
+    refresh_current_params(*(client.pk for client in clients))
+
+
+def populate_catalog(rng):
+    types = bulk_create([TrainingType(name=f"Тип {n}") for n in range(5)])
+    # Названия групп мышц хранятся нормализованными (workouts.catalog)
+    muscles = bulk_create([MuscleGroup(name=f"мышца {n}") for n in range(12)])
+    exercises = bulk_create([
+        Exercise(name=f"Упражнение {n}", training_type=rng.choice(types))
+        for n in range(100)
+    ])
+    bulk_create([
+        ExerciseMuscleGroup(
+            exercise=exercise, muscle_group=muscle, is_target=not number
+        )
+        for exercise in exercises
+        for number, muscle in enumerate(rng.sample(muscles, 3))
+    ])
+    bulk_create([
+        Products(name=f"Продукт {rng.choice('абвгд')} {n}", kkal=100,
+                 protein=10, carbo=10, fat=10, describe="")
+        for n in range(500)
+    ])
+    bulk_create([Meals(name=f"Блюдо {n}") for n in range(200)])
+    return muscles[0]
+
+
+def populate(specialists, clients, plans, days, params):
+    """Специалисты с клиентами, их планы по дням, параметры и справочники.
+
+    Возвращает объекты, с которыми работают сценарии.
+    """
+    rng = random.Random(0)
+    dob = datetime.date(1990, 1, 1)
+    specialist_users = bulk_create([
+        User(email=f"bench-spec{n}@example.com", is_specialist=True)
+        for n in range(specialists)
+    ])
+    client_users = bulk_create([
+        User(email=f"bench-client{n}@example.com", first_name=f"Имя {n}",
+             dob=dob, is_specialist=False)
+        for n in range(specialists * clients)
+    ])
+    links = bulk_create([
+        SpecialistClient(
+            specialist=specialist_users[n // clients], user=client,
+            notes="Заметка",
+        )
+        for n, client in enumerate(client_users)
+    ])
+    training_plans, diet_plans = populate_plans(
+        client_users, links, plans, days, rng
+    )
+    populate_params(client_users, params, rng)
+    muscle = populate_catalog(rng)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return {
+        "specialist": specialist_users[0],
+        "client": client_users[0],
+        "link": links[0],
+        "training_plan": training_plans[0],
+        "diet_plan": diet_plans[0],
+        "muscle": muscle,
+    }
+
+
+def request_case(user, method, url, data=None):
+    """Сценарий запроса к API через полный цикл обработки Django.
+
+    data может быть функцией номера повтора, если запрос должен
+    отличаться (например, новый email при создании клиента).
+    """
+    client = APIClient(
+        HTTP_HOST=settings.ALLOWED_HOSTS[0].replace("*", "localhost")
+    )
+    client.force_authenticate(user=user)
+    counter = itertools.count()
+
+    def run():
+        payload = data(next(counter)) if callable(data) else data
+        response = getattr(client, method)(url, payload, format="json")
+        if response.status_code >= 300:
+            raise CommandError(
+                f"{method.upper()} {url}: {response.status_code}"
+            )
+        if response.streaming:
+            b"".join(response.streaming_content)
+
+    return run
+
+
+def serializer_case(serializer_class, instance, user, many=False):
+    """Сценарий сериализации заранее загруженных объектов без запросов."""
+    request = Request(APIRequestFactory().get("/"))
+    request.user = user
+    if many:
+        instance = list(instance)
+
+    def run():
+        return serializer_class(
+            instance, many=many, context={"request": request}
+        ).data
+
+    return run
+
+
+def plan_payload(objects, plural):
+    return {
+        "specialist": objects["specialist"].pk,
+        "user": objects["client"].pk,
+        "name": "Новый план",
+        plural: [{"weekday": day, "spec_comment": "Комментарий"}
+                 for day in WEEKDAYS],
+    }
+
+
+def get_read_cases(objects):
+    specialist, client = objects["specialist"], objects["client"]
+    user = f"?user={client.pk}"
+    tp, dp = objects["training_plan"].pk, objects["diet_plan"].pk
+    link = objects["link"].pk
+    reads = {
+        "training-plans list": f"/api/training-plans/{user}",
+        "training-plans list fields": (
+            f"/api/training-plans/{user}&fields=id,name,create_dt"
+        ),
+        "training-plans retrieve": f"/api/training-plans/{tp}/{user}",
+        "diet-plans list": f"/api/diet-plans/{user}",
+        "diet-plans retrieve": f"/api/diet-plans/{dp}/{user}",
+        "clients list": "/api/clients/",
+        "clients retrieve": f"/api/clients/{link}/",
+        "clients export": "/api/clients/export/",
+        "params list": f"/api/params/{user}",
+        "params series": f"/api/params/series/{user}&points=50",
+        "products search": "/api/products/?search=продукт",
+        "meals search": "/api/meals/?search=блюдо",
+        "exercises list": "/api/exercises/",
+        "exercises by muscle": "/api/exercises/?{}".format(
+            urlencode({"muscle": objects["muscle"].name})
+        ),
+        "users list": "/api/users/",
+        "users me": "/api/users/me/",
+    }
+    cases = {
+        name: request_case(specialist, "get", url)
+        for name, url in reads.items()
+    }
+    for name in ("workout", "diet"):
+        cases[f"users get_{name}_programs"] = request_case(
+            client, "get", f"/api/users/get_{name}_programs/"
+        )
+    return cases
+
+
+def get_write_cases(objects):
+    specialist = objects["specialist"]
+    tp = objects["training_plan"].pk
+    training_plan = plan_payload(objects, "training")
+    return {
+        "training-plans create": request_case(
+            specialist, "post", "/api/training-plans/", training_plan
+        ),
+        "training-plans update": request_case(
+            specialist, "put",
+            f"/api/training-plans/{tp}/?user={objects['client'].pk}",
+            training_plan,
+        ),
+        "diet-plans create": request_case(
+            specialist, "post", "/api/diet-plans/",
+            plan_payload(objects, "diet"),
+        ),
+        "clients create": request_case(
+            specialist, "post", "/api/clients/",
+            lambda number: {
+                "user": {"email": f"bench-new{number}@example.com",
+                         "first_name": "Новый", "gender": "0",
+                         "params": {"weight": 70, "height": 180}},
+                "notes": "Заметка",
+            },
+        ),
+    }
+
+
+def get_serializer_cases(objects):
+    specialist, client = objects["specialist"], objects["client"]
+    clients = SpecialistClient.objects.filter(specialist=specialist)
+    return {
+        "TrainingPlanSerializer": serializer_case(
+            TrainingPlanSerializer,
+            TrainingPlan.objects.filter(user=client)
+            .prefetch_related("training"),
+            specialist, many=True,
+        ),
+        "DietPlanSerializer": serializer_case(
+            DietPlanSerializer,
+            DietPlan.objects.filter(user=client).prefetch_related("diet"),
+            specialist, many=True,
+        ),
+        "ClientListSerializer": serializer_case(
+            ClientListSerializer,
+            ClientListSerializer.setup_eager_loading(clients),
+            specialist, many=True,
+        ),
+        "ClientProfileSerializer": serializer_case(
+            ClientProfileSerializer,
+            ClientProfileSerializer.setup_eager_loading(clients).get(
+                pk=objects["link"].pk
+            ),
+            specialist,
+        ),
+        "CustomUserSerializer": serializer_case(
+            CustomUserSerializer,
+            User.objects.select_related("current_params").get(pk=client.pk),
+            client,
+        ),
+        "ParamsSerializer": serializer_case(
+            ParamsSerializer, Params.objects.filter(user=client), client,
+            many=True,
+        ),
+    }
+
+
+def get_cases(objects):
+    """Все сценарии: чтение, запись и сериализация без БД."""
+    return {
+        **get_read_cases(objects),
+        **get_write_cases(objects),
+        **get_serializer_cases(objects),
+    }
+
+
+def measure(run, repeat):
+    """Число запросов, время и пиковая память одного сценария.
+
+    Перед каждым прогоном кэш очищается, чтобы замерялась обработка,
+    а не чтение готового ответа. Первый прогон прогревочный. Запросы
+    считаются через execute_wrapper: connection.queries очищается
+    сигналом начала запроса.
+    """
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    cache.clear()
+    run()
+    cache.clear()
+    with connection.execute_wrapper(count_query):
+        run()
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    cache.clear()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    timings.sort()
+    return {
+        "queries": len(queries),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.db import transaction
+
+import hashlib
+import uuid
+
+from users.models import SpecialistClient
+
+CLIENT_IDS_KEY = "specialist_client_ids:{}"
+CLIENT_IDS_TIMEOUT = 60 * 60
+PLAN_VERSION_KEY = "plan_version:{}"
+
+
+def get_specialist_client_ids(specialist_id):
+    """Множество id клиентов специалиста из общего кэша.
+
+    Значения хранятся строками UUID, при промахе кэш заполняется
+    одним запросом к SpecialistClient.
+    """
+    key = CLIENT_IDS_KEY.format(specialist_id)
+    client_ids = cache.get(key)
+    if client_ids is None:
+        client_ids = frozenset(
+            str(user_id)
+            for user_id in SpecialistClient.objects.filter(
+                specialist_id=specialist_id, user__isnull=False
+            ).values_list("user_id", flat=True)
+        )
+        cache.set(key, client_ids, CLIENT_IDS_TIMEOUT)
+    return client_ids
+
+
+def invalidate_specialist_client_ids(*specialist_ids):
+    cache.delete_many(
+        [
+            CLIENT_IDS_KEY.format(specialist_id)
+            for specialist_id in specialist_ids
+            if specialist_id is not None
+        ]
+    )
+
+
+def get_plan_version(user_id):
+    """Текущая метка версии планов клиента.
+
+    Метка входит в ключ кэша ответов, поэтому ее смена делает
+    недоступными все ранее закэшированные ответы по клиенту.
+    """
+    key = PLAN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    cache.add(key, uuid.uuid4().hex, None)
+    return cache.get(key)
+
+
+def bump_plan_versions(*user_ids):
+    """Смена метки версии планов клиентов.
+
+    Повторяется после коммита, чтобы параллельный запрос не
+    закэшировал данные незавершенной транзакции под новой меткой.
+    """
+    keys = [
+        PLAN_VERSION_KEY.format(user_id)
+        for user_id in set(user_ids)
+        if user_id is not None
+    ]
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    if keys:
+        bump()
+        transaction.on_commit(bump)
+
+
+def get_plan_cache_key(prefix, view, request):
+    """Ключ кэша для GET запроса к вьюсету планов клиента.
+
+    Включает автора запроса, клиента из query parameter user, полный
+    путь запроса и текущую метку версии планов клиента. Возвращает
+    None, если клиент в запросе не указан.
+    """
+    try:
+        client_id = uuid.UUID(request.query_params.get("user"))
+    except (TypeError, ValueError):
+        return None
+    path = hashlib.md5(
+        request.get_full_path().encode(), usedforsecurity=False
+    ).hexdigest()
+    return "{}:{}:{}:{}:{}:{}".format(
+        prefix,
+        view.basename,
+        request.user.pk,
+        client_id,
+        get_plan_version(client_id),
+        path,
+    )
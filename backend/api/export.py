@@ -0,0 +1,91 @@
+"""Потоковая выгрузка клиентов специалиста в NDJSON и CSV.
+
+Клиенты читаются через QuerySet.iterator(chunk_size=...) (на
+PostgreSQL это серверный курсор, если не включен DB_PGBOUNCER),
+предзагрузка связанных данных выполняется для каждой пачки отдельно,
+а строки ответа формируются генератором, поэтому расход памяти не
+зависит от числа клиентов.
+"""
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 200
+USER_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "middle_name",
+    "email",
+    "phone_number",
+    "dob",
+    "gender",
+)
+PROFILE_COLUMNS = (
+    "age",
+    "diseases",
+    "exp_diets",
+    "exp_trainings",
+    "bad_habits",
+    "food_preferences",
+    "notes",
+)
+NESTED_COLUMNS = ("params", "trainings", "diets")
+CSV_COLUMNS = (
+    ("id", "created_at")
+    + tuple(f"user_{column}" for column in USER_COLUMNS)
+    + PROFILE_COLUMNS
+    + NESTED_COLUMNS
+)
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def to_json(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False)
+
+
+def iter_clients(queryset, serializer_class, context):
+    for client in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield serializer_class(client, context=context).data
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield to_json(row) + "\n"
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        user = row["user"]
+        values = [row["id"], row["created_at"]]
+        values += [user.get(column) for column in USER_COLUMNS]
+        values += [row[column] for column in PROFILE_COLUMNS]
+        values += [to_json(row[column]) for column in NESTED_COLUMNS]
+        yield writer.writerow(values)
+
+
+def export_clients(queryset, serializer_class, context, output="ndjson"):
+    """StreamingHttpResponse с выгрузкой клиентов в формате output."""
+    rows = iter_clients(queryset, serializer_class, context)
+    content = iter_csv(rows) if output == "csv" else iter_ndjson(rows)
+    response = StreamingHttpResponse(
+        content, content_type=CONTENT_TYPES[output]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="clients.{output}"'
+    )
+    return response
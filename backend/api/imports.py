@@ -0,0 +1,122 @@
+"""Пакетный импорт клиентов специалиста из JSON или CSV.
+
+Все строки проверяются до записи, при любой ошибке ничего не
+сохраняется и возвращаются ошибки по номерам строк. Пользователи,
+параметры и связи со специалистом создаются через bulk_create пачками
+в одной транзакции, стандартный пароль хэшируется один раз.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+import csv
+import io
+
+from users.models import Params, SpecialistClient
+from users.params import refresh_current_params
+
+from .cache import invalidate_specialist_client_ids
+from .serializers import ClientImportRowSerializer
+
+User = get_user_model()
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ROWS = 5000
+
+
+def read_rows(request):
+    """Строки импорта из JSON-массива или CSV-файла в поле file."""
+    upload = request.FILES.get("file")
+    if upload is not None:
+        try:
+            text = io.TextIOWrapper(upload.file, encoding="utf-8-sig")
+            rows = [
+                {key: value for key, value in row.items() if value != ""}
+                for row in csv.DictReader(text)
+            ]
+        except (UnicodeDecodeError, csv.Error):
+            raise ValidationError({"file": "Не удалось прочитать CSV-файл."})
+    else:
+        rows = request.data
+    if not isinstance(rows, list) or not rows:
+        raise ValidationError(
+            "Ожидается непустой JSON-массив клиентов или CSV-файл в поле file."
+        )
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise ValidationError(
+            f"За один импорт можно добавить не более {IMPORT_MAX_ROWS} "
+            "клиентов."
+        )
+    return rows
+
+
+def validate_rows(rows):
+    """Проверенные строки и список ошибок вида {"row": n, "errors": {}}."""
+    validated, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        serializer = ClientImportRowSerializer(data=row)
+        if serializer.is_valid():
+            validated.append(serializer.validated_data)
+        else:
+            errors.append({"row": number, "errors": serializer.errors})
+    if errors:
+        return validated, errors
+    emails = {}
+    for number, row in enumerate(validated, start=1):
+        if row["email"] in emails:
+            errors.append({"row": number, "errors": {"email": [
+                f"E-mail повторяется в строке {emails[row['email']]}."
+            ]}})
+        emails.setdefault(row["email"], number)
+    existing = User.objects.filter(email__in=emails).values_list(
+        "email", flat=True
+    )
+    for email in existing:
+        errors.append({"row": emails[email], "errors": {"email": [
+            "Пользователь с таким e-mail уже существует."
+        ]}})
+    errors.sort(key=lambda error: error["row"])
+    return validated, errors
+
+
+@transaction.atomic
+def create_clients(specialist, rows):
+    """Создание клиентов специалиста, возвращает число добавленных."""
+    # make_password намеренно медленный: один хэш на всю пачку
+    password = make_password(settings.STD_CLIENT_PASSWORD)
+    users, params, clients = [], [], []
+    for row in rows:
+        user = User(
+            password=password,
+            is_specialist=False,
+            **{field: row.get(field)
+               for field in ClientImportRowSerializer.user_fields},
+        )
+        users.append(user)
+        row_params = {
+            field: row.get(field)
+            for field in ClientImportRowSerializer.params_fields
+        }
+        if any(value is not None for value in row_params.values()):
+            params.append(Params(user=user, **row_params))
+        clients.append(
+            SpecialistClient(
+                specialist=specialist,
+                user=user,
+                **{field: row.get(field)
+                   for field in ClientImportRowSerializer.client_fields},
+            )
+        )
+    User.objects.bulk_create(users, batch_size=IMPORT_BATCH_SIZE)
+    Params.objects.bulk_create(params, batch_size=IMPORT_BATCH_SIZE)
+    SpecialistClient.objects.bulk_create(
+        clients, batch_size=IMPORT_BATCH_SIZE
+    )
+    refresh_current_params(*(params.user_id for params in params))
+    invalidate_specialist_client_ids(specialist.pk)
+    transaction.on_commit(
+        lambda: invalidate_specialist_client_ids(specialist.pk)
+    )
+    return len(clients)
@@ -0,0 +1,134 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+import json
+import os
+
+from api.benchmarks import BENCH_CACHES, get_cases, measure, populate
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "benchmarks.json",
+)
+# Разница меньше этой не считается регрессией, чтобы шум таймера
+# не ронял быстрые сценарии.
+MIN_SLOWDOWN_MS = 2.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеры сценариев API и сериализаторов на синтетических данных: "
+        "число запросов к БД, медиана и p95 времени, пиковая память. "
+        "Результаты сравниваются с базовыми значениями для текущей СУБД "
+        "из api/benchmarks.json. Команда завершается ошибкой, если "
+        "выросло число запросов или время и память превысили базовые "
+        "больше чем на --threshold, а также если для сценария нет "
+        "базового значения. Данные создаются в транзакции и "
+        "откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--specialists", type=int, default=3)
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--plans", type=int, default=3)
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--params", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument(
+            "--case",
+            action="append",
+            default=None,
+            help="Подстрока имени сценария, можно несколько.",
+        )
+        parser.add_argument("--baseline", default=BASELINE_PATH)
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Записать результаты как базовые для текущей СУБД.",
+        )
+        parser.add_argument("--threshold", type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=BENCH_CACHES), transaction.atomic():
+            objects = populate(
+                options["specialists"],
+                options["clients"],
+                options["plans"],
+                options["days"],
+                options["params"],
+            )
+            results = {
+                name: measure(run, options["repeat"])
+                for name, run in get_cases(objects).items()
+                if not options["case"]
+                or any(part in name for part in options["case"])
+            }
+            transaction.set_rollback(True)
+        baselines = self.load_baselines(options["baseline"])
+        if options["update_baseline"]:
+            baselines.setdefault(connection.vendor, {}).update(results)
+            with open(options["baseline"], "w") as file:
+                json.dump(baselines, file, indent=2, sort_keys=True)
+                file.write("\n")
+            self.stdout.write(f"Базовые значения записаны в "
+                              f"{options['baseline']}")
+        self.report(
+            results,
+            baselines.get(connection.vendor, {}),
+            options["threshold"],
+        )
+
+    def load_baselines(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+
+    def find_regressions(self, result, baseline, threshold):
+        regressions = []
+        if result["queries"] > baseline["queries"]:
+            regressions.append(
+                f"запросов {baseline['queries']} -> {result['queries']}"
+            )
+        slowdown = result["median_ms"] - baseline["median_ms"]
+        if (slowdown > MIN_SLOWDOWN_MS
+                and slowdown > baseline["median_ms"] * threshold):
+            regressions.append(
+                f"время {baseline['median_ms']} -> {result['median_ms']} ms"
+            )
+        if result["peak_kb"] > baseline["peak_kb"] * (1 + threshold):
+            regressions.append(
+                f"память {baseline['peak_kb']} -> {result['peak_kb']} KB"
+            )
+        return regressions
+
+    def report(self, results, baselines, threshold):
+        self.stdout.write(
+            f"{connection.vendor}\n{'сценарий':<32}{'запросов':>9}"
+            f"{'median, ms':>12}{'p95, ms':>10}{'память, KB':>12}"
+        )
+        failed = []
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<32}{result['queries']:>9}"
+                f"{result['median_ms']:>12.2f}{result['p95_ms']:>10.2f}"
+                f"{result['peak_kb']:>12.1f}"
+            )
+            if name not in baselines:
+                regressions = ["нет базового значения"]
+            else:
+                regressions = self.find_regressions(
+                    result, baselines[name], threshold
+                )
+            if regressions:
+                failed.append(name)
+                self.stdout.write(
+                    self.style.ERROR(f"    {'; '.join(regressions)}")
+                )
+        if failed:
+            raise CommandError(
+                f"Регрессия или нет базовых значений для "
+                f"{connection.vendor} в сценариях: {', '.join(failed)}. "
+                f"Базовые значения записываются с --update-baseline."
+            )
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+import statistics
+import time
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение задержки запросов к API без переиспользования "
+        "соединения с БД (CONN_MAX_AGE=0) и с постоянными соединениями "
+        "из текущих настроек DATABASES. Запросы проходят через полный "
+        "цикл обработки Django, включая закрытие соединений по "
+        "сигналам request_started/request_finished."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/clients/")
+        parser.add_argument("--email", default=None)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--conn-max-age", type=int, default=None)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options["email"]:
+            users = users.filter(email=options["email"])
+        user = users.order_by("created_at").first()
+        if user is None:
+            raise CommandError("Не найден пользователь для запросов")
+        self.environ = RequestFactory().get(
+            options["path"],
+            HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(user)}",
+            HTTP_HOST=settings.ALLOWED_HOSTS[0].replace("*", "localhost"),
+        ).environ
+        max_age = options["conn_max_age"]
+        if max_age is None:
+            max_age = connection.settings_dict["CONN_MAX_AGE"] or 60
+        self.stdout.write(
+            f"{connection.vendor}, {options['requests']} запросов "
+            f"GET {options['path']}"
+        )
+        for label, value in (("без переиспользования", 0),
+                             (f"CONN_MAX_AGE={max_age}", max_age)):
+            self.report(
+                label, *self.measure(options["requests"], value)
+            )
+
+    def measure(self, count, max_age):
+        """Запросы через WSGIHandler, как у gunicorn.
+
+        Тестовый клиент Django не подходит: он отключает закрытие
+        соединений по сигналам запроса.
+        """
+        handler = WSGIHandler()
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        timings = []
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                response = handler(dict(self.environ), lambda *args: None)
+                b"".join(response)
+                response.close()
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"{self.environ['PATH_INFO']} вернул "
+                        f"{response.status_code}"
+                    )
+        finally:
+            connection_created.disconnect(count_connection)
+        return timings, len(opened)
+
+    def report(self, label, timings, opened):
+        timings.sort()
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f"{label:<24} median {statistics.median(timings):7.2f} ms"
+            f"   p95 {p95:7.2f} ms   соединений открыто: {opened}"
+        )
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+import statistics
+import time
+
+from users.tokens import ClaimsAccessToken
+
+User = get_user_model()
+
+# Стандартный набор Django: сессии, CSRF и сообщения на каждый запрос
+STATEFUL_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение накладных расходов на запрос к API со стандартным "
+        "набором middleware Django и с набором из настроек MIDDLEWARE, "
+        "который пропускает сессии, CSRF и сообщения для API. Запросы "
+        "с JWT проходят через WSGIHandler, как у gunicorn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/clients/")
+        parser.add_argument("--email", default=None)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options["email"]:
+            users = users.filter(email=options["email"])
+        user = users.order_by("created_at").first()
+        if user is None:
+            raise CommandError("Не найден пользователь для запросов")
+        self.environ = RequestFactory().get(
+            options["path"],
+            HTTP_AUTHORIZATION=f"JWT {ClaimsAccessToken.for_user(user)}",
+            HTTP_HOST=settings.ALLOWED_HOSTS[0].replace("*", "localhost"),
+        ).environ
+        self.stdout.write(
+            f"{connection.vendor}, {options['requests']} запросов "
+            f"GET {options['path']}"
+        )
+        with override_settings(MIDDLEWARE=STATEFUL_MIDDLEWARE):
+            stateful = WSGIHandler()
+        results = self.measure(
+            {"стандартный": stateful, "без состояния": WSGIHandler()},
+            options["requests"],
+        )
+        for label, result in results.items():
+            self.report(label, *result)
+        saved = (
+            statistics.median(results["стандартный"][0])
+            - statistics.median(results["без состояния"][0])
+        )
+        self.stdout.write(f"экономия на запрос: {saved * 1000:.0f} мкс")
+
+    def measure(self, handlers, count):
+        """Время и число запросов к БД на запрос для каждого handler.
+
+        Запросы к handlers чередуются, чтобы дрейф скорости машины
+        одинаково влиял на оба набора middleware.
+        """
+        timings = {label: [] for label in handlers}
+        queries = dict.fromkeys(handlers, 0)
+        cookies = {}
+        current = [None]
+
+        def count_query(execute, sql, params, many, context):
+            queries[current[0]] += 1
+            return execute(sql, params, many, context)
+
+        for handler in handlers.values():
+            self.request(handler)
+        with connection.execute_wrapper(count_query):
+            for _ in range(count):
+                for label, handler in handlers.items():
+                    current[0] = label
+                    started = time.perf_counter()
+                    response = self.request(handler)
+                    timings[label].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+                    cookies[label] = sorted(response.cookies)
+        return {
+            label: (timings[label], queries[label] / count, cookies[label])
+            for label in handlers
+        }
+
+    def request(self, handler):
+        response = handler(dict(self.environ), lambda *args: None)
+        b"".join(response)
+        response.close()
+        if response.status_code != 200:
+            raise CommandError(
+                f"{self.environ['PATH_INFO']} вернул {response.status_code}"
+            )
+        return response
+
+    def report(self, label, timings, queries, cookies):
+        timings.sort()
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f"{label:<14} median {statistics.median(timings):7.3f} ms"
+            f"   p95 {p95:7.3f} ms   запросов к БД: {queries:g}"
+            f"   cookies: {', '.join(cookies) or '-'}"
+        )
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+import io
+
+from api.benchmarks import (BENCH_CACHES, get_serializer_cases, measure,
+                            populate,)
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+PAYLOAD_CASES = (
+    "TrainingPlanSerializer",
+    "DietPlanSerializer",
+    "ClientProfileSerializer",
+    "ClientListSerializer",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение JSONRenderer/JSONParser DRF с FastJSONRenderer/"
+        "FastJSONParser на ответах сериализаторов планов и клиентов: "
+        "медиана времени и пиковая память рендеринга и разбора. "
+        "Команда завершается ошибкой, если ответы различаются. Данные "
+        "создаются в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--plans", type=int, default=30)
+        parser.add_argument("--days", type=int, default=28)
+        parser.add_argument("--repeat", type=int, default=30)
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=BENCH_CACHES), transaction.atomic():
+            objects = populate(
+                1, options["clients"], options["plans"], options["days"], 1
+            )
+            payloads = {
+                name: run()
+                for name, run in get_serializer_cases(objects).items()
+                if name in PAYLOAD_CASES
+            }
+            transaction.set_rollback(True)
+        for name, data in payloads.items():
+            self.compare(name, data, options["repeat"])
+
+    def compare(self, name, data, repeat):
+        content = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != content:
+            raise CommandError(f"{name}: ответы рендереров различаются")
+        parsed = JSONParser().parse(io.BytesIO(content))
+        if FastJSONParser().parse(io.BytesIO(content)) != parsed:
+            raise CommandError(f"{name}: результаты парсеров различаются")
+        self.stdout.write(f"{name} ({len(content) / 1024:.1f} KB)")
+        for action, stdlib, fast in (
+            ("render",
+             lambda: JSONRenderer().render(data),
+             lambda: FastJSONRenderer().render(data)),
+            ("parse",
+             lambda: JSONParser().parse(io.BytesIO(content)),
+             lambda: FastJSONParser().parse(io.BytesIO(content))),
+        ):
+            before, after = measure(stdlib, repeat), measure(fast, repeat)
+            self.stdout.write(
+                f"  {action:<7}"
+                f"{before['median_ms']:8.3f} -> {after['median_ms']:7.3f} ms"
+                f" (x{before['median_ms'] / after['median_ms']:.1f})"
+                f"   {before['peak_kb']:8.1f} -> {after['peak_kb']:7.1f} KB"
+            )
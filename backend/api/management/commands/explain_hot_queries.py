@@ -0,0 +1,178 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+import random
+import re
+
+from users.models import Params, SpecialistClient
+from workouts.models import TrainingPlan
+
+from diets.models import DietPlan, Products
+from diets.search import search
+
+User = get_user_model()
+
+SEQ_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)(?! USING)"),
+}
+SORT = {
+    "postgresql": re.compile(r"\bSort\b"),
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+}
+# Запросы, план которых должен использовать указанный индекс
+EXPECTED_INDEXES = {
+    "Поиск продуктов": (
+        "postgresql", f"{Products._meta.db_table}_name_trgm"
+    ),
+}
+PRODUCT_WORDS = (
+    "гречка", "каша", "рис", "овсянка", "творог", "курица", "индейка",
+    "говядина", "лосось", "яблоко", "банан", "йогурт", "сыр", "хлеб",
+)
+SEED_BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN для частых запросов API на синтетических данных. "
+        "Команда завершается ошибкой, если в плане есть "
+        "последовательное сканирование таблицы (отдельная сортировка "
+        "выводится как предупреждение). Данные создаются в "
+        "транзакции и откатываются. В PostgreSQL поиск продуктов "
+        "должен использовать триграммный индекс (Bitmap Index Scan)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--specialists", type=int, default=50)
+        parser.add_argument("--clients", type=int, default=5000)
+        parser.add_argument("--plans", type=int, default=4)
+        parser.add_argument("--params", type=int, default=10)
+        parser.add_argument("--products", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SEQ_SCAN:
+            raise CommandError(f"{connection.vendor} не поддерживается")
+        with transaction.atomic():
+            specialist, client = self.populate(options)
+            plans = self.explain_all(specialist, client)
+            transaction.set_rollback(True)
+        self.report(plans)
+
+    def populate(self, options):
+        rng = random.Random(0)
+        specialists = [
+            User(email=f"explain-spec{number}@example.com")
+            for number in range(options["specialists"])
+        ]
+        clients = [
+            User(email=f"explain-client{number}@example.com",
+                 is_specialist=False)
+            for number in range(options["clients"])
+        ]
+        User.objects.bulk_create(
+            specialists + clients, batch_size=SEED_BATCH_SIZE
+        )
+        links, params, training_plans, diet_plans = [], [], [], []
+        for client in clients:
+            specialist = rng.choice(specialists)
+            links.append(SpecialistClient(specialist=specialist, user=client))
+            params += [
+                Params(user=client, weight=rng.randint(50, 120))
+                for _ in range(options["params"])
+            ]
+            for number in range(options["plans"]):
+                training_plans.append(TrainingPlan(
+                    specialist=specialist, user=client, name=f"tp{number}"
+                ))
+                diet_plans.append(DietPlan(
+                    specialist=specialist, user=client, name=f"dp{number}"
+                ))
+        products = [
+            Products(
+                name=f"{' '.join(rng.sample(PRODUCT_WORDS, 2))} {number}",
+                kkal=100, protein=1, carbo=1, fat=1, describe="",
+            )
+            for number in range(options["products"])
+        ]
+        for model, objects in ((SpecialistClient, links), (Params, params),
+                               (TrainingPlan, training_plans),
+                               (DietPlan, diet_plans), (Products, products)):
+            model.objects.bulk_create(objects, batch_size=SEED_BATCH_SIZE)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Создано клиентов: {len(clients)}, параметров: {len(params)}, "
+            f"планов: {len(training_plans) + len(diet_plans)}, "
+            f"продуктов: {len(products)}"
+        )
+        return links[0].specialist, links[0].user
+
+    def hot_queries(self, specialist, client):
+        queries = {
+            "Планы тренировок клиента": TrainingPlan.objects.filter(
+                user=client
+            ).order_by("-create_dt"),
+            "Планы тренировок специалиста": TrainingPlan.objects.filter(
+                specialist=specialist
+            ).order_by("-create_dt"),
+            "Планы питания клиента": DietPlan.objects.filter(
+                user=client
+            ).order_by("-create_dt"),
+            "Планы питания специалиста": DietPlan.objects.filter(
+                specialist=specialist
+            ).order_by("-create_dt"),
+            "Связь специалист-клиент": SpecialistClient.objects.filter(
+                specialist=specialist, user=client
+            ),
+            "Страница клиентов специалиста": SpecialistClient.objects.filter(
+                specialist=specialist
+            ).order_by("-created_at", "-id")[:51],
+            "Последние параметры клиента": Params.objects.filter(
+                user=client
+            ).order_by("-created_at")[:1],
+        }
+        if connection.vendor == "postgresql":
+            # В SQLite поиск идет по виртуальной таблице FTS5, ее план
+            # всегда содержит SCAN
+            queries["Поиск продуктов"] = search(
+                Products.objects.all(), "гречк"
+            )[:50]
+        return queries
+
+    def explain_all(self, specialist, client):
+        return {
+            name: queryset.explain()
+            for name, queryset in self.hot_queries(specialist, client).items()
+        }
+
+    def report(self, plans):
+        pattern = SEQ_SCAN[connection.vendor]
+        failed = []
+        for name, plan in plans.items():
+            scans = pattern.findall(plan)
+            vendor, index = EXPECTED_INDEXES.get(name, (None, None))
+            if vendor == connection.vendor and index not in plan:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"{name}: индекс {index} не используется"
+                ))
+            elif scans:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"{name}: последовательное сканирование "
+                    f"{', '.join(sorted(set(scans)))}"
+                ))
+            elif SORT[connection.vendor].search(plan):
+                self.stdout.write(self.style.WARNING(
+                    f"{name}: индекс, но сортировка выполняется отдельно"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: индекс"))
+            self.stdout.write(f"    {plan.replace(chr(10), chr(10) + '    ')}")
+        if failed:
+            raise CommandError(
+                f"Последовательное сканирование в запросах: "
+                f"{', '.join(failed)}"
+            )
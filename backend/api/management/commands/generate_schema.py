@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерация OpenAPI схемы в SCHEMA_FILE. Запускается при сборке "
+        "образа, чтобы /api/schema/ отдавал готовую схему без "
+        "обхода вьюсетов на каждый запрос."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=settings.SCHEMA_FILE)
+
+    def handle(self, *args, **options):
+        artifact = write_schema(options["file"])
+        self.stdout.write(
+            f"Схема {artifact['version'][:12]} "
+            f"({artifact['paths']} путей) "
+            f"сохранена в {options['file']}"
+        )
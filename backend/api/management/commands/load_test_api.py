@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+DEFAULT_PATHS = (
+    "/api/users/get_workout_programs/",
+    "/api/users/get_diet_programs/",
+    "/api/clients/",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест эндпоинтов чтения на запущенных серверах. "
+        "Например, для сравнения режимов SERVER_MODE=wsgi и asgi: "
+        "--target wsgi=http://127.0.0.1:9000 "
+        "--target asgi=http://127.0.0.1:9001 --email user@example.com"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="Имя и адрес сервера в виде name=url, можно несколько.",
+        )
+        parser.add_argument(
+            "--email",
+            required=True,
+            help="Пользователь, от имени которого выполняются запросы.",
+        )
+        parser.add_argument("--path", action="append", default=None)
+        parser.add_argument("--concurrency", default="1,10,50")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options["email"])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['email']} не найден")
+        token = AccessToken.for_user(user)
+        self.headers = {"Authorization": f"JWT {token}"}
+        self.timeout = options["timeout"]
+        paths = options["path"] or DEFAULT_PATHS
+        levels = [int(level) for level in options["concurrency"].split(",")]
+        self.stdout.write(
+            f"{'сервер':<10}{'потоков':>8}{'rps':>10}"
+            f"{'p50, ms':>10}{'p95, ms':>10}{'ошибок':>8}"
+        )
+        for target in options["target"]:
+            name, _, base_url = target.partition("=")
+            if not base_url:
+                raise CommandError(f"Неверный --target {target!r}")
+            urls = [base_url.rstrip("/") + path for path in paths]
+            for level in levels:
+                self.report(name, level, *self.run(
+                    urls, level, options["requests"]
+                ))
+
+    def fetch(self, url):
+        request = urllib.request.Request(url, headers=self.headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(
+                request, timeout=self.timeout
+            ) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    def run(self, urls, concurrency, total):
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def worker():
+            results = []
+            while True:
+                with lock:
+                    number = next(counter, None)
+                if number is None:
+                    return results
+                results.append(self.fetch(urls[number % len(urls)]))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            futures = [executor.submit(worker) for _ in range(concurrency)]
+            results = [item for future in futures for item in future.result()]
+        elapsed = time.perf_counter() - started
+        return results, elapsed
+
+    def report(self, name, concurrency, results, elapsed):
+        timings = sorted(timing for timing, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f"{name:<10}{concurrency:>8}{len(results) / elapsed:>10.1f}"
+            f"{statistics.median(timings):>10.1f}{p95:>10.1f}{errors:>8}"
+        )
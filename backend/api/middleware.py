@@ -0,0 +1,52 @@
+"""Middleware, пропускаемые для запросов к API.
+
+API аутентифицируется только по JWT, поэтому сессии, CSRF, сообщения
+и request.user из сессии ему не нужны: для путей из
+STATELESS_PATH_PREFIXES эти middleware передают запрос дальше без
+обработки. Пути из STATEFUL_PATH_PREFIXES (социальная авторизация
+хранит state OAuth в сессии) и админка обрабатываются как обычно.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_stateless_request(request):
+    path = request.path_info
+    return path.startswith(settings.STATELESS_PATH_PREFIXES) and not (
+        path.startswith(settings.STATEFUL_PATH_PREFIXES)
+    )
+
+
+class StatelessPathMixin:
+    def __call__(self, request):
+        # В режиме ASGI get_response и super().__call__ возвращают
+        # корутины, которые ожидает предыдущий middleware.
+        if is_stateless_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class StatelessSessionMiddleware(StatelessPathMixin, SessionMiddleware):
+    pass
+
+
+class StatelessCsrfViewMiddleware(StatelessPathMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_stateless_request(request):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class StatelessAuthenticationMiddleware(
+    StatelessPathMixin, AuthenticationMiddleware
+):
+    pass
+
+
+class StatelessMessageMiddleware(StatelessPathMixin, MessageMiddleware):
+    pass
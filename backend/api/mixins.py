@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+import hashlib
+
+from .cache import get_plan_cache_key
+
+
+class SparseFieldsetQuerysetMixin:
+    """Queryset вьюсета, подстроенный под ?fields= и ?expand= запроса.
+
+    Используется с сериализаторами на основе SparseFieldsetMixin.
+    """
+
+    def get_queryset(self):
+        return self.get_serializer_class().setup_eager_loading(
+            super().get_queryset(), self.request
+        )
+
+
+class PlanResponseCacheMixin:
+    """Кэширование ответов list и retrieve для вьюсетов планов.
+
+    Ключ строится из автора запроса, клиента, действия, id плана и
+    query parameters, а также метки версии планов клиента, которая
+    меняется при любом изменении его планов и их дней.
+    """
+
+    cache_timeout = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = get_plan_cache_key("plan_response", self, request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout or settings.PLAN_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class PlanConditionalMixin:
+    """Условные GET запросы (ETag и Last-Modified) для вьюсетов планов.
+
+    Валидаторы считаются одним агрегирующим запросом по edit_dt плана
+    и его дней и числу записей, поэтому ответ 304 отдается без
+    выборки объектов и сериализации. Результат хранится в кэше под
+    меткой версии планов клиента и пересчитывается после ее смены.
+    """
+
+    def get_validators(self, request):
+        key = get_plan_cache_key("plan_validators", self, request)
+        validators = key and cache.get(key)
+        if not validators:
+            validators = self.calculate_validators(request)
+            if key:
+                cache.set(key, validators, settings.PLAN_CACHE_TIMEOUT)
+        return validators
+
+    def calculate_validators(self, request):
+        nested_field = self.get_serializer_class().nested_field
+        queryset = self.filter_queryset(self.get_queryset())
+        if "pk" in self.kwargs:
+            queryset = queryset.filter(pk=self.kwargs["pk"])
+        state = queryset.order_by().aggregate(
+            plans_edit_dt=Max("edit_dt"),
+            days_edit_dt=Max(f"{nested_field}__edit_dt"),
+            plans=Count("id", distinct=True),
+            days=Count(nested_field),
+        )
+        last_modified = max(
+            filter(None, (state["plans_edit_dt"], state["days_edit_dt"])),
+            default=None,
+        )
+        etag = hashlib.md5(
+            "{}:{}:{}:{}".format(
+                request.get_full_path(),
+                last_modified and last_modified.isoformat(),
+                state["plans"],
+                state["days"],
+            ).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return f'W/"{etag}"', (
+            last_modified and int(last_modified.timestamp())
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.headers["ETag"] = etag
+            if last_modified:
+                response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,293 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+import base64
+import binascii
+import datetime
+import json
+
+PLAN_CURSOR_ORDERING = ("-create_dt", "-id")
+# SQLite не сообщает диапазон целых полей, ограничение BIGINT
+MAX_CURSOR_INT = 2 ** 63 - 1
+
+
+def get_paginated_response_schema(schema):
+    """Схема ответа со ссылками next/previous и списком results."""
+    return {
+        "type": "object",
+        "required": ["results"],
+        "properties": {
+            "next": {"type": "string", "nullable": True, "format": "uri"},
+            "previous": {"type": "string", "nullable": True, "format": "uri"},
+            "results": schema,
+        },
+    }
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная (keyset) пагинация.
+
+    Курсор хранит значения полей сортировки крайней записи страницы,
+    следующая страница выбирается условием WHERE по этим значениям,
+    поэтому стоимость запроса не зависит от глубины пролистывания.
+    Последнее поле сортировки должно быть уникальным (обычно id),
+    оно разрешает совпадения значений остальных полей.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Неверный курсор."
+
+    def get_ordering(self, view):
+        return getattr(view, "cursor_ordering", self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor["p"], bool(cursor.get("r"))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.fields
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse=False):
+        cursor = {"p": position}
+        if reverse:
+            cursor["r"] = 1
+        data = json.dumps(cursor, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_position(self, obj):
+        position = []
+        for field, _ in self.fields:
+            value = getattr(obj, field)
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, str, type(None))):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def parse_position(self, queryset, position):
+        """Значения курсора, приведенные к типам полей сортировки.
+
+        Курсор приходит от клиента, поэтому значение неверного типа
+        дает 404, как у CursorPagination DRF, а не ошибку в запросе.
+        """
+        opts = queryset.model._meta
+        try:
+            # clean() проверяет формат и диапазон чисел СУБД
+            values = [
+                opts.get_field(field).clean(value, None)
+                for (field, _), value in zip(self.fields, position)
+            ]
+        except (ValidationError, ValueError, TypeError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        for value in values:
+            if value is None or (
+                isinstance(value, int) and abs(value) > MAX_CURSOR_INT
+            ):
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_keyset_filter(self, position, reverse):
+        """Условие «после позиции» для составного ключа сортировки."""
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.fields, position):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Срез queryset для текущей страницы (с одной лишней записью).
+
+        Вынесено отдельно, чтобы асинхронные вьюхи могли выполнить
+        запрос через async ORM и передать строки в set_page.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_value = self.get_page_size(request)
+        self.fields = [
+            (field.lstrip("-"), field.startswith("-"))
+            for field in self.get_ordering(view)
+        ]
+        self.position, self.reverse = self.decode_cursor(request)
+        order_by = [
+            ("-" if descending != self.reverse else "") + field
+            for field, descending in self.fields
+        ]
+        queryset = queryset.order_by(*order_by)
+        if self.position is not None:
+            position = self.parse_position(queryset, self.position)
+            queryset = queryset.filter(
+                self.get_keyset_filter(position, self.reverse)
+            )
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, rows):
+        rows = list(rows)
+        has_more = len(rows) > self.page_size_value
+        page = rows[:self.page_size_value]
+        if self.reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = page
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(self.get_page_queryset(queryset, request, view))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            self.get_position(self.page[0]), reverse=True
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Курсор страницы из ссылок next/previous.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Количество записей на странице.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class SearchPagination(BasePagination):
+    """Постраничный вывод результатов поиска без подсчета общего числа.
+
+    Результаты отсортированы по релевантности, поэтому используется
+    смещение, а наличие следующей страницы определяется выборкой
+    одной лишней записи вместо COUNT по всем совпадениям.
+    """
+
+    page_query_param = "page"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        try:
+            self.page_number = _positive_int(
+                request.query_params.get(self.page_query_param, 1),
+                strict=True,
+            )
+            page_size = _positive_int(
+                request.query_params.get(
+                    self.page_size_query_param, self.page_size
+                ),
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except ValueError:
+            raise NotFound("Неверный номер страницы.")
+        offset = (self.page_number - 1) * page_size
+        page = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(page) > page_size
+        return page[:page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        if self.page_number == 2:
+            return remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(
+            self.base_url, self.page_query_param, self.page_number - 1
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.page_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Номер страницы.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Количество записей на странице.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,31 @@
+"""JSON парсер API на orjson.
+
+Тело в UTF-8 разбирается orjson. Другие кодировки, отсутствие orjson
+и ошибки разбора передаются JSONParser DRF, поэтому сообщения об
+ошибках не меняются.
+"""
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+import codecs
+import io
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(content), media_type, parser_context
+            )
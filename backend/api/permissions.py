@@ -2,6 +2,10 @@ from django.contrib.auth import get_user_model
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 from rest_framework.serializers import ValidationError
 
+import uuid
+
+from .cache import get_specialist_client_ids
+
 User = get_user_model()
 
 
@@ -46,8 +50,23 @@ class IsCurUserOrTheirSpecialistPermission(BasePermission):
     our request payload в списке пользователей, привязанных к автору
     запроса через модель SpecialistClient и выдаем разрешение на
     использование данного вьюсета, если находим.
+
+    Множество клиентов специалиста берется из общего кэша и
+    запоминается на объекте запроса, поэтому проверка сводится
+    к поиску в множестве.
     """
 
+    def is_specialist_client(self, request, user_id):
+        try:
+            user_id = str(uuid.UUID(str(user_id)))
+        except ValueError:
+            return False
+        if not hasattr(request, "specialist_client_ids"):
+            request.specialist_client_ids = get_specialist_client_ids(
+                request.user.pk
+            )
+        return user_id in request.specialist_client_ids
+
     def has_permission(self, request, view):
         if all(
             (
@@ -66,10 +85,28 @@ class IsCurUserOrTheirSpecialistPermission(BasePermission):
                     "object."
                 )
             )
+        if not request.user.is_authenticated:
+            return False
         if request.method == "POST":
-            return request.user.specialist_client_spec.filter(
-                user=request.data["user"]
-            ).exists()
-        return request.user.specialist_client_spec.filter(
-            user=request.query_params.get("user")
-        ).exists()
+            return self.is_specialist_client(request, request.data["user"])
+        return self.is_specialist_client(
+            request, request.query_params.get("user")
+        )
+
+
+class IsCurUserOrTheirSpecialistReadPermission(
+    IsCurUserOrTheirSpecialistPermission
+):
+    """Чтение данных пользователя им самим или его специалистом.
+
+    Query parameter user необязателен, без него запрос относится к
+    текущему пользователю.
+    """
+
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        user_id = request.query_params.get("user")
+        if not user_id or user_id == str(request.user.pk):
+            return True
+        return self.is_specialist_client(request, user_id)
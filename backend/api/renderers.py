@@ -0,0 +1,61 @@
+"""JSON рендерер API на orjson.
+
+Даты, время, Decimal, UUID, ленивые строки и прочие типы, которые
+orjson не сериализует так же, передаются в JSONEncoder DRF, поэтому
+ответ совпадает с JSONRenderer DRF, кроме чисел с плавающей точкой
+(и Decimal, которые JSONEncoder приводит к float):
+
+- экспоненциальная запись другая: 1e-7, 1e20 и 0.000025 вместо
+  1e-07, 1e+20 и 2.5e-05, значения после разбора те же;
+- NaN и бесконечности записываются как null, а JSONRenderer при
+  STRICT_JSON (по умолчанию) падает на них с ValueError.
+
+Без orjson, с отступами (браузерный API) и при ошибке orjson ответ
+рендерит JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# JSONRenderer экранирует разделители строк, как того требует JavaScript
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self.can_render_fast(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+    def can_render_fast(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
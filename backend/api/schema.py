@@ -0,0 +1,177 @@
+"""OpenAPI схема из заранее собранного файла.
+
+Генерация схемы drf_spectacular обходит все вьюсеты и сериализаторы
+и занимает сотни миллисекунд. Команда generate_schema сохраняет схему
+в SCHEMA_FILE при сборке образа, SchemaView отдает готовые байты из
+памяти процесса с ETag. Файл привязан к версии кода (хешу исходников
+проекта, режима сервера и настроек, от которых зависит схема): если
+версия не совпадает, схема один раз генерируется заново и файл
+перезаписывается.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+import drf_spectacular
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+from pathlib import Path
+
+RENDERERS = {
+    renderer.format: renderer
+    for renderer in (OpenApiYamlRenderer, OpenApiJsonRenderer)
+}
+SKIP_SOURCE_DIRS = {"tests", "migrations", "__pycache__"}
+# Настройки DRF, от которых зависит схема. Частоты и прокси задаются
+# окружением и не должны делать устаревшей схему из образа.
+SCHEMA_REST_FRAMEWORK_KEYS = (
+    "DEFAULT_AUTHENTICATION_CLASSES",
+    "DEFAULT_PERMISSION_CLASSES",
+    "DEFAULT_FILTER_BACKENDS",
+    "DEFAULT_PAGINATION_CLASS",
+    "DEFAULT_PARSER_CLASSES",
+    "DEFAULT_RENDERER_CLASSES",
+    "DEFAULT_SCHEMA_CLASS",
+)
+
+generate_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def get_code_version():
+    """Хеш исходников пакетов проекта, настроек схемы и режима сервера.
+
+    Тесты и миграции на схему не влияют и не учитываются.
+    """
+    digest = hashlib.sha256()
+    digest.update(drf_spectacular.__version__.encode())
+    digest.update(repr(settings.SPECTACULAR_SETTINGS).encode())
+    digest.update(repr([
+        settings.REST_FRAMEWORK.get(key) for key in SCHEMA_REST_FRAMEWORK_KEYS
+    ]).encode())
+    # Режим сервера меняет urlpatterns: в asgi чтение идет через
+    # асинхронные вьюхи, схема собирается по ним
+    digest.update(repr(
+        (settings.SERVER_MODE, settings.ASYNC_READ_VIEWS)
+    ).encode())
+    base_dir = Path(settings.BASE_DIR)
+    packages = sorted(
+        path.parent for path in base_dir.glob("*/__init__.py")
+    )
+    for package in packages:
+        for path in sorted(package.rglob("*.py")):
+            relative = path.relative_to(base_dir)
+            if SKIP_SOURCE_DIRS.intersection(relative.parts):
+                continue
+            digest.update(relative.as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def generate_schema():
+    """Схема, как у команды spectacular drf_spectacular."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF
+    )
+    return generator.get_schema(
+        request=None, public=spectacular_settings.SERVE_PUBLIC
+    )
+
+
+def build_artifact():
+    """Схема, отрендеренная во все форматы, и версия кода.
+
+    Рендеринг YAML занимает больше времени, чем сама генерация,
+    поэтому в файле хранится готовый текст каждого формата.
+    """
+    schema = generate_schema()
+    return {
+        "version": get_code_version(),
+        "paths": len(schema["paths"]),
+        "content": {
+            schema_format: renderer().render(
+                schema, renderer_context={}
+            ).decode()
+            for schema_format, renderer in RENDERERS.items()
+        },
+    }
+
+
+def write_schema(path=None):
+    """Генерация схемы и запись в файл."""
+    path = Path(path or settings.SCHEMA_FILE)
+    artifact = build_artifact()
+    # Запись через временный файл: воркеры не прочитают файл частично
+    descriptor, temp_path = tempfile.mkstemp(dir=path.parent)
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(artifact, file, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        os.unlink(temp_path)
+        raise
+    return artifact
+
+
+def read_schema(path):
+    """Схема из файла, None если файла нет или он от другого кода."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            artifact = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if artifact.get("version") != get_code_version():
+        return None
+    return artifact
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_document():
+    """Содержимое схемы и ETag по формату, один раз на процесс."""
+    with generate_lock:
+        artifact = read_schema(settings.SCHEMA_FILE)
+        if artifact is None:
+            try:
+                artifact = write_schema()
+            except OSError:
+                # Файл недоступен для записи, схема остается в памяти
+                artifact = build_artifact()
+    document = {}
+    for schema_format, text in artifact["content"].items():
+        content = text.encode()
+        etag = hashlib.md5(content, usedforsecurity=False).hexdigest()
+        document[schema_format] = (content, f'"{etag}"')
+    return document
+
+
+class SchemaView(SpectacularAPIView):
+    """SpectacularAPIView с готовой схемой вместо генерации на запрос.
+
+    Запросы с ?lang= или ?version= обрабатываются как раньше.
+    """
+
+    def _get_schema_response(self, request):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super()._get_schema_response(request)
+        renderer = request.accepted_renderer
+        content, etag = get_schema_document()[renderer.format]
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(content, content_type=content_type)
+            response.headers["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response.headers["ETag"] = etag
+        patch_vary_headers(response, ["Accept"])
+        return response
@@ -2,24 +2,30 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
+from django.db.models import Case, Prefetch, Q, Value, When
+from django.db.models.functions import ExtractYear
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import status
-from rest_framework.serializers import (
-    CharField, ChoiceField, DateField, DateTimeField, EmailField, FloatField,
-    IntegerField, ModelSerializer, ReadOnlyField, Serializer,
-    SerializerMethodField, ValidationError,)
+from rest_framework.serializers import (CharField, ChoiceField, DateField,
+                                        DateTimeField, EmailField, FloatField,
+                                        IntegerField, ListField,
+                                        ModelSerializer, ReadOnlyField,
+                                        Serializer, SerializerMethodField,
+                                        ValidationError,)
 
 import datetime
 
+from collections import defaultdict
 from config.settings import GENDER_CHOICES, SPECIALIST_ROLE_CHOICES
 from djoser.serializers import UserSerializer
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from users.models import (Education, Institution, Params, SpecialistClient,
                           Specialists,)
+from users.params import SERIES_METRICS, SERIES_PERIODS, refresh_current_params
 from workouts.models import Training, TrainingPlan, TrainingPlanTraining
 
-from diets.models import DietPlan, DietPlanDiet, Diets
+from diets.models import DietPlan, DietPlanDiet, Diets, Meals, Products
 
 User = get_user_model()
 
@@ -39,10 +45,200 @@ class TrainingSerializer(ModelSerializer):
         )
 
 
-class TrainingPlanSerializer(ModelSerializer):
+class NestedPlanWriteMixin:
+    """Атомарная запись вложенных дней плана тренировок или питания.
+
+    Дни и строки связующей таблицы создаются через bulk_create.
+    При обновлении присланные дни сравниваются с текущими по значениям
+    полей: совпадающие остаются нетронутыми, лишние удаляются вместе
+    со связями, недостающие создаются.
+    """
+
+    nested_field = None
+    nested_model = None
+    through_model = None
+    through_nested_field = None
+    through_plan_field = None
+
+    def get_nested_key(self, item):
+        child = self.fields[self.nested_field].child
+        fields = [
+            name for name, field in child.fields.items() if not field.read_only
+        ]
+        if isinstance(item, dict):
+            return tuple(item.get(field) for field in fields)
+        return tuple(getattr(item, field) for field in fields)
+
+    def add_nested(self, plan, items):
+        if not items:
+            return
+        objs = self.nested_model.objects.bulk_create(
+            [self.nested_model(**item) for item in items]
+        )
+        self.through_model.objects.bulk_create(
+            [
+                self.through_model(
+                    **{self.through_nested_field: obj,
+                       self.through_plan_field: plan}
+                )
+                for obj in objs
+            ]
+        )
+
+    def sync_nested(self, plan, items):
+        unchanged = defaultdict(list)
+        for obj in getattr(plan, self.nested_field).all():
+            unchanged[self.get_nested_key(obj)].append(obj.pk)
+        new_items = []
+        for item in items:
+            pks = unchanged[self.get_nested_key(item)]
+            if pks:
+                pks.pop()
+            else:
+                new_items.append(item)
+        removed = [pk for pks in unchanged.values() for pk in pks]
+        if removed:
+            self.through_model.objects.filter(
+                **{self.through_plan_field: plan,
+                   f"{self.through_nested_field}__in": removed}
+            ).delete()
+            still_linked = self.through_model.objects.filter(
+                **{f"{self.through_nested_field}__in": removed}
+            ).values(self.through_nested_field)
+            self.nested_model.objects.filter(pk__in=removed).exclude(
+                pk__in=still_linked
+            ).delete()
+        self.add_nested(plan, new_items)
+        getattr(plan, "_prefetched_objects_cache", {}).pop(
+            self.nested_field, None
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        items = validated_data.pop(self.nested_field, [])
+        plan = super().create(validated_data)
+        self.add_nested(plan, items)
+        return plan
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        items = validated_data.pop(self.nested_field, None)
+        instance = super().update(instance, validated_data)
+        if items is not None:
+            self.sync_nested(instance, items)
+        return instance
+
+
+class UserShortSerializer(ModelSerializer):
+    """Краткие данные пользователя для раскрытия связей через ?expand="""
+
+    class Meta:
+        model = User
+        fields = (
+            "id",
+            "first_name",
+            "last_name",
+            "middle_name",
+            "email",
+        )
+
+
+class SparseFieldsetMixin:
+    """Выбор полей ответа через query parameters fields и expand.
+
+    ?fields=id,name оставляет в ответе только перечисленные поля
+    (неизвестное поле - ответ 400),
+    ?expand=user заменяет id связанного объекта его представлением из
+    expandable_fields. Без параметров ответ не меняется. Параметры
+    учитываются только в GET запросах и только на верхнем уровне.
+    setup_eager_loading подстраивает queryset под выбранные поля:
+    лишние колонки не читаются, невыбранные вложенные списки не
+    предзагружаются, раскрытые связи загружаются через JOIN.
+    """
+
+    expandable_fields = {}
+
+    @classmethod
+    def get_selection(cls, request):
+        """Запрошенные поля (None, если все) и раскрываемые связи."""
+        if request is None or request.method != "GET":
+            return None, set()
+        params = request.query_params
+        fields = params.get("fields")
+        if fields is not None:
+            fields = {name for name in fields.split(",") if name}
+            unknown = fields.difference(cls.Meta.fields)
+            if unknown:
+                raise ValidationError({
+                    "fields": [
+                        f"Неизвестное поле: {name}" for name in sorted(unknown)
+                    ]
+                })
+        expand = {
+            name for name in params.get("expand", "").split(",")
+            if name in cls.expandable_fields
+        }
+        return fields, expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.root not in (self, self.parent):
+            return fields
+        selected, expand = self.get_selection(self.context.get("request"))
+        for name in expand:
+            fields[name] = self.expandable_fields[name](read_only=True)
+        if selected is None:
+            return fields
+        return {
+            name: field
+            for name, field in fields.items()
+            if name in selected or name in expand
+        }
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request):
+        selected, expand = cls.get_selection(request)
+        names = [
+            name for name in cls.Meta.fields
+            if selected is None or name in selected or name in expand
+        ]
+        opts = queryset.model._meta
+        concrete = {field.name: field for field in opts.concrete_fields}
+        if selected is not None:
+            # Внешние ключи нужны проверкам прав и ссылкам на объекты
+            queryset = queryset.only(
+                opts.pk.name,
+                *(name for name, field in concrete.items()
+                  if field.is_relation),
+                *(name for name in names if name in concrete),
+            )
+        many = {
+            field.name for field in opts.get_fields()
+            if field.many_to_many or field.one_to_many
+        }
+        prefetch = [name for name in names if name in many]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        # select_related() без аргументов присоединил бы все связи
+        return queryset.select_related(*expand) if expand else queryset
+
+
+class TrainingPlanSerializer(
+    SparseFieldsetMixin, NestedPlanWriteMixin, ModelSerializer
+):
     """Сериализатор плана тренировок"""
 
     training = TrainingSerializer(many=True, required=False)
+    expandable_fields = {
+        "user": UserShortSerializer,
+        "specialist": UserShortSerializer,
+    }
+
+    nested_field = "training"
+    nested_model = Training
+    through_model = TrainingPlanTraining
+    through_nested_field = "training"
+    through_plan_field = "training_plan"
 
     class Meta:
         model = TrainingPlan
@@ -52,30 +248,10 @@ class TrainingPlanSerializer(ModelSerializer):
             "user",
             "name",
             "describe",
+            "create_dt",
             "training",
         )
 
-    def add_trainings(self, trainings, training_plan):
-        for training in trainings:
-            current_training = Training.objects.create(**training)
-            TrainingPlanTraining.objects.create(
-                training=current_training, training_plan=training_plan
-            )
-        return training_plan
-
-    def create(self, validated_data):
-        if "training" not in self.initial_data:
-            return TrainingPlan.objects.create(**validated_data)
-        trainings = validated_data.pop("training")
-        training_plan = TrainingPlan.objects.create(**validated_data)
-        return self.add_trainings(trainings, training_plan)
-
-    def update(self, instance, validated_data):
-        instance.training.clear()
-        trainings = validated_data.pop("training")
-        instance = super().update(instance, validated_data)
-        return self.add_trainings(trainings, instance)
-
 
 class DietsSerializer(ModelSerializer):
     """Сериализатор диет"""
@@ -89,13 +265,26 @@ class DietsSerializer(ModelSerializer):
             "weekday",
             "spec_comment",
             "user_comment",
+            "kkal_total",
+            "protein_total",
+            "carbo_total",
+            "fat_total",
         )
 
 
-class DietPlanSerializer(ModelSerializer):
+class DietPlanSerializer(
+    SparseFieldsetMixin, NestedPlanWriteMixin, ModelSerializer
+):
     """Сериализатор плана питания"""
 
     diet = DietsSerializer(many=True, required=False)
+    expandable_fields = TrainingPlanSerializer.expandable_fields
+
+    nested_field = "diet"
+    nested_model = Diets
+    through_model = DietPlanDiet
+    through_nested_field = "diet"
+    through_plan_field = "diet_plan"
 
     class Meta:
         model = DietPlan
@@ -108,28 +297,79 @@ class DietPlanSerializer(ModelSerializer):
             "protein",
             "carbo",
             "fat",
+            "kkal_total",
+            "protein_total",
+            "carbo_total",
+            "fat_total",
             "describe",
+            "create_dt",
             "diet",
         )
 
-    def add_diets(self, diets, diet_plan):
-        for diet in diets:
-            current_diet = Diets.objects.create(**diet)
-            DietPlanDiet.objects.create(diet=current_diet, diet_plan=diet_plan)
-        return diet_plan
 
-    def create(self, validated_data):
-        if "diet" not in self.initial_data:
-            return DietPlan.objects.create(**validated_data)
-        diets = validated_data.pop("diet")
-        diet_plan = DietPlan.objects.create(**validated_data)
-        return self.add_diets(diets, diet_plan)
+class ProductSerializer(ModelSerializer):
+    """Сериализатор справочника продуктов"""
+
+    class Meta:
+        model = Products
+        fields = (
+            "id",
+            "name",
+            "kkal",
+            "protein",
+            "carbo",
+            "fat",
+            "photo",
+        )
 
-    def update(self, instance, validated_data):
-        instance.diet.clear()
-        diets = validated_data.pop("diet")
-        instance = super().update(instance, validated_data)
-        return self.add_diets(diets, instance)
+
+class MealSerializer(ModelSerializer):
+    """Сериализатор справочника блюд"""
+
+    class Meta:
+        model = Meals
+        fields = (
+            "id",
+            "name",
+            "photo",
+            "kkal_total",
+            "protein_total",
+            "carbo_total",
+            "fat_total",
+        )
+
+
+class CatalogTrainingTypeSerializer(Serializer):
+    """Тип тренировки в каталоге упражнений"""
+
+    id = IntegerField()
+    name = CharField()
+
+
+class TrainingTypeSerializer(CatalogTrainingTypeSerializer):
+    """Сериализатор справочника типов тренировок"""
+
+    describe = CharField(allow_null=True)
+
+
+class MuscleGroupSerializer(Serializer):
+    """Сериализатор справочника групп мышц"""
+
+    id = IntegerField()
+    name = CharField()
+
+
+class ExerciseCatalogSerializer(Serializer):
+    """Упражнение из каталога (workouts.catalog), только для схемы API"""
+
+    id = IntegerField()
+    name = CharField()
+    photo = CharField(allow_null=True)
+    describe = CharField(allow_null=True)
+    link = CharField(allow_null=True)
+    training_type = CatalogTrainingTypeSerializer(allow_null=True)
+    target_muscles = ListField(child=CharField())
+    auxiliary_muscles = ListField(child=CharField())
 
 
 class DietPlanLinkSerializer(Serializer):
@@ -192,6 +432,27 @@ class ParamsSerializer(ModelSerializer):
         )
 
 
+class ParamsSeriesQuerySerializer(Serializer):
+    """Параметры запроса временного ряда"""
+
+    user = CharField(required=False)
+    metric = ChoiceField(choices=SERIES_METRICS, default="weight")
+    period = ChoiceField(choices=SERIES_PERIODS, default="day")
+    points = IntegerField(min_value=3, max_value=1000, default=200)
+    date_from = DateField(required=False)
+    date_to = DateField(required=False)
+
+
+class ParamsSeriesPointSerializer(Serializer):
+    """Точка временного ряда параметров"""
+
+    bucket = DateTimeField()
+    avg = FloatField()
+    min = FloatField()
+    max = FloatField()
+    count = IntegerField()
+
+
 class InstitutionSerializer(ModelSerializer):
     class Meta:
         model = Institution
@@ -266,9 +527,7 @@ class SpecialistClientSerializer(ModelSerializer):
 class CustomUserSerializer(UserSerializer):
     """Сериализатор пользователей"""
 
-    params = ParamsSerializer(
-        many=True, required=False, default=None, read_only=True, partial=True
-    )
+    params = SerializerMethodField()
     gender = ChoiceField(
         required=False,
         choices=GENDER_CHOICES,
@@ -305,6 +564,13 @@ class CustomUserSerializer(UserSerializer):
         )
         read_only_fields = ("email",)
 
+    @extend_schema_field(field=ParamsSerializer(many=True))
+    def get_params(self, obj):
+        """Только текущие параметры, история доступна в /api/params/."""
+        if obj.current_params is None:
+            return []
+        return [ParamsSerializer(obj.current_params).data]
+
     @transaction.atomic
     def create(self, validated_data):
         params_data = self.initial_data.get("params")
@@ -323,6 +589,7 @@ class CustomUserSerializer(UserSerializer):
                     if params.get("weight")
                 ]
             )
+
         if specialist_data:
             Specialists.objects.bulk_create(
                 [
@@ -337,6 +604,9 @@ class CustomUserSerializer(UserSerializer):
                 ]
             )
         instance.save()
+        if params_data:
+            refresh_current_params(instance.id)
+            instance.refresh_from_db(fields=["current_params"])
         return instance
 
     def update(self, instance, validated_data, partial=True):
@@ -412,8 +682,39 @@ class ClientListSerializer(ModelSerializer):
             "age",
         )
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Данные клиента и его возраст, вычисленный в БД, одним запросом."""
+        today = datetime.date.today()
+        full_years = Value(today.year) - ExtractYear("user__dob")
+        had_birthday = Q(user__dob__month__lt=today.month) | Q(
+            user__dob__month=today.month, user__dob__day__lte=today.day
+        )
+        return (
+            queryset.select_related("user")
+            .only(
+                "id",
+                "notes",
+                "created_at",
+                "user__id",
+                "user__first_name",
+                "user__last_name",
+                "user__dob",
+            )
+            .annotate(
+                user_age=Case(
+                    When(had_birthday, then=full_years),
+                    default=full_years - 1,
+                )
+            )
+        )
+
     @extend_schema_field(OpenApiTypes.INT)
     def get_age(self, obj):
+        if hasattr(obj, "user_age"):
+            if obj.user_age is None:
+                return "Возраст не указан"
+            return obj.user_age
         dob = obj.user.dob
         if not dob:
             return "Возраст не указан"
@@ -481,10 +782,6 @@ class ClientAddSerializer(ModelSerializer):
                     code=status.HTTP_400_BAD_REQUEST,
                 )
             gender = gender_link
-        if params:
-            user_params = Params.objects.create(**params)
-        else:
-            user_params = None
         client, created = User.objects.get_or_create(
             **user_data,
             password=password,
@@ -492,7 +789,16 @@ class ClientAddSerializer(ModelSerializer):
             gender=gender,
             is_specialist=False,
         )
-        client.params.add(user_params)
+        if SpecialistClient.objects.filter(
+            specialist=specialist, user=client
+        ).exists():
+            raise ValidationError(
+                "Этот пользователь уже является вашим клиентом.",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+        if params:
+            # Сигнал post_save Params обновляет current_params клиента
+            Params.objects.create(user=client, **params)
         diseases = data.get("diseases")
         exp_diets = data.get("exp_diets")
         notes = data.get("notes")
@@ -511,12 +817,66 @@ class ClientAddSerializer(ModelSerializer):
         )
 
     def to_representation(self, obj):
-        params_data = obj.user.params.first()
         ret = super().to_representation(obj)
-        ret["user"]["params"] = ParamsSerializer(params_data).data
+        ret["user"]["params"] = ParamsSerializer(obj.user.current_params).data
         return ret
 
 
+class ClientImportRowSerializer(Serializer):
+    """Строка импорта клиентов: данные пользователя, параметры и анкета"""
+
+    email = EmailField(max_length=settings.EMAIL_MAX_LENGTH)
+    first_name = CharField(
+        max_length=settings.NAME_MAX_LENGTH, required=False, allow_null=True
+    )
+    last_name = CharField(
+        max_length=settings.NAME_MAX_LENGTH, required=False, allow_null=True
+    )
+    middle_name = CharField(
+        max_length=settings.NAME_MAX_LENGTH, required=False, allow_null=True
+    )
+    phone_number = CharField(
+        max_length=settings.PHONE_MAX_LENGTH,
+        required=False,
+        allow_null=True,
+    )
+    dob = DateField(required=False, allow_null=True)
+    gender = ChoiceField(choices=GENDER_CHOICES, default="0")
+    role = ChoiceField(choices=SPECIALIST_ROLE_CHOICES, default="0")
+    weight = FloatField(required=False, allow_null=True)
+    height = IntegerField(required=False, allow_null=True)
+    waist_size = IntegerField(required=False, allow_null=True)
+    diseases = CharField(required=False, allow_null=True)
+    exp_diets = CharField(required=False, allow_null=True)
+    exp_trainings = CharField(required=False, allow_null=True)
+    bad_habits = CharField(required=False, allow_null=True)
+    food_preferences = CharField(required=False, allow_null=True)
+    notes = CharField(required=False, allow_null=True)
+
+    user_fields = (
+        "email",
+        "first_name",
+        "last_name",
+        "middle_name",
+        "phone_number",
+        "dob",
+        "gender",
+        "role",
+    )
+    params_fields = ("weight", "height", "waist_size")
+    client_fields = (
+        "diseases",
+        "exp_diets",
+        "exp_trainings",
+        "bad_habits",
+        "food_preferences",
+        "notes",
+    )
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+
 class UpdateClientSerializer(ModelSerializer):
     class Meta:
         model = SpecialistClient
@@ -567,18 +927,69 @@ class ClientProfileSerializer(ModelSerializer):
             return today.year - dob.year - 1
         return today.year - dob.year
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Предзагрузка всех данных карточки клиента.
+
+        Количество запросов не зависит от числа планов клиента.
+        """
+        return queryset.select_related(
+            "user", "user__current_params"
+        ).prefetch_related(
+            Prefetch(
+                "user__user_training_plan",
+                queryset=TrainingPlan.objects.prefetch_related("training"),
+            ),
+            Prefetch(
+                "user__diet_plan_user",
+                queryset=DietPlan.objects.prefetch_related("diet"),
+            ),
+        )
+
     @extend_schema_field(field=TrainingPlanSerializer(many=True))
     def get_trainings(self, obj):
-        queryset = obj.user.user_training_plan.filter(user=obj.user)
+        queryset = obj.user.user_training_plan.all()
         return TrainingPlanSerializer(queryset, many=True).data
 
     @extend_schema_field(field=DietPlanSerializer(many=True))
     def get_diets(self, obj):
-        queryset = obj.user.diet_plan_user.filter(user=obj.user)
+        queryset = obj.user.diet_plan_user.all()
         return DietPlanSerializer(queryset, many=True).data
 
     def to_representation(self, obj):
-        params_data = obj.user.params.first()
         ret = super().to_representation(obj)
-        ret["user"]["params"] = ParamsSerializer(params_data).data
+        ret["user"]["params"] = ParamsSerializer(obj.user.current_params).data
         return ret
+
+
+class ClientExportSerializer(ClientProfileSerializer):
+    """Сериализатор выгрузки клиента со всей историей параметров"""
+
+    id = ReadOnlyField()
+    params = SerializerMethodField()
+
+    class Meta(ClientProfileSerializer.Meta):
+        fields = ("id", "created_at") + ClientProfileSerializer.Meta.fields + (
+            "params",
+        )
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Предзагрузка планов и всей истории параметров клиентов."""
+        return queryset.select_related(
+            "user", "user__current_params"
+        ).prefetch_related(
+            Prefetch(
+                "user__user_training_plan",
+                queryset=TrainingPlan.objects.prefetch_related("training"),
+            ),
+            Prefetch(
+                "user__diet_plan_user",
+                queryset=DietPlan.objects.prefetch_related("diet"),
+            ),
+            Prefetch("user__params", to_attr="params_history"),
+        )
+
+    @extend_schema_field(field=ParamsSerializer(many=True))
+    def get_params(self, obj):
+        return ParamsSerializer(obj.user.params_history, many=True).data
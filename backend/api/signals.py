@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save,)
+from django.dispatch import receiver
+
+from users.models import SpecialistClient
+from workouts.models import Training, TrainingPlan, TrainingPlanTraining
+
+from diets.models import DietPlan, DietPlanDiet, Diets
+from diets.nutrition import diet_plan_totals_changed
+
+from .cache import bump_plan_versions, invalidate_specialist_client_ids
+
+
+@receiver(pre_save, sender=SpecialistClient)
+def remember_previous_specialist(sender, instance, **kwargs):
+    """Запоминаем прежнего специалиста, если связь переназначают."""
+    if instance.pk is None:
+        instance.previous_specialist_id = None
+        return
+    instance.previous_specialist_id = (
+        SpecialistClient.objects.filter(pk=instance.pk)
+        .values_list("specialist_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=SpecialistClient)
+@receiver(post_delete, sender=SpecialistClient)
+def invalidate_client_ids(sender, instance, **kwargs):
+    """Сбрасываем кэш id клиентов специалиста при изменении связей.
+
+    Сброс повторяется после коммита, чтобы параллельный запрос не
+    оставил в кэше данные незавершенной транзакции.
+    """
+    specialist_ids = {
+        instance.specialist_id,
+        getattr(instance, "previous_specialist_id", None),
+    }
+    invalidate_specialist_client_ids(*specialist_ids)
+    transaction.on_commit(
+        lambda: invalidate_specialist_client_ids(*specialist_ids)
+    )
+
+
+@receiver(post_save, sender=TrainingPlan)
+@receiver(post_delete, sender=TrainingPlan)
+@receiver(post_save, sender=DietPlan)
+@receiver(post_delete, sender=DietPlan)
+def invalidate_plan_responses(sender, instance, **kwargs):
+    bump_plan_versions(instance.user_id)
+
+
+@receiver(post_save, sender=TrainingPlanTraining)
+@receiver(post_delete, sender=TrainingPlanTraining)
+def invalidate_training_link_responses(sender, instance, **kwargs):
+    bump_plan_versions(
+        *TrainingPlan.objects.filter(
+            pk=instance.training_plan_id
+        ).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=DietPlanDiet)
+@receiver(post_delete, sender=DietPlanDiet)
+def invalidate_diet_link_responses(sender, instance, **kwargs):
+    bump_plan_versions(
+        *DietPlan.objects.filter(
+            pk=instance.diet_plan_id
+        ).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Training)
+@receiver(pre_delete, sender=Training)
+def invalidate_training_responses(sender, instance, **kwargs):
+    bump_plan_versions(
+        *TrainingPlan.objects.filter(training=instance).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Diets)
+@receiver(pre_delete, sender=Diets)
+def invalidate_diet_responses(sender, instance, **kwargs):
+    bump_plan_versions(
+        *DietPlan.objects.filter(diet=instance).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+@receiver(diet_plan_totals_changed)
+def invalidate_diet_plan_totals_responses(sender, plan_ids, **kwargs):
+    bump_plan_versions(
+        *DietPlan.objects.filter(pk__in=plan_ids).values_list(
+            "user_id", flat=True
+        )
+    )
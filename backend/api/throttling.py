@@ -0,0 +1,132 @@
+"""Ограничение частоты запросов к эндпоинтам с хешированием паролей.
+
+Проверка пароля занимает сотни миллисекунд процессора, поэтому вход,
+регистрация, смена и восстановление пароля ограничиваются до обработки
+запроса. Ограничения действуют только для вьюх с throttle_scope,
+частоты берутся из DEFAULT_THROTTLE_RATES по этому scope. Счетчики
+хранятся в кэше по умолчанию отдельно для IP, email из тела запроса
+и пользователя.
+"""
+from rest_framework.throttling import SimpleRateThrottle
+
+import hashlib
+import time
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Token bucket на частотах DRF.
+
+    Частота "10/min" - корзина на 10 запросов, которая пополняется
+    равномерно в течение минуты. В кэше хранится пара (остаток
+    токенов, время), а не история запросов, как у SimpleRateThrottle.
+    Чтение и запись корзины выполняются под блокировкой через
+    cache.add, чтобы параллельные запросы не превысили частоту.
+    """
+
+    lock_timeout = 1
+    lock_attempts = 20
+    lock_wait = 0.005
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.tokens = 0
+        lock_key = f"{self.key}:lock"
+        if not self.acquire(lock_key):
+            # Корзину одновременно обновляют другие запросы
+            return self.throttle_failure()
+        try:
+            return self.take_token()
+        finally:
+            self.cache.delete(lock_key)
+
+    def acquire(self, lock_key):
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, 1, self.lock_timeout):
+                return True
+            time.sleep(self.lock_wait)
+        return False
+
+    def take_token(self):
+        self.now = self.timer()
+        tokens, updated = self.cache.get(
+            self.key, (self.num_requests, self.now)
+        )
+        self.tokens = min(
+            self.num_requests,
+            tokens + (self.now - updated) * self.num_requests / self.duration,
+        )
+        if self.tokens < 1:
+            return self.throttle_failure()
+        self.cache.set(self.key, (self.tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """Token bucket с частотой по throttle_scope вьюхи.
+
+    По умолчанию корзина своя для каждого IP клиента, наследники
+    меняют ключ через get_scoped_ident.
+    """
+
+    ident_kind = "ip"
+
+    def __init__(self):
+        # Частота определяется по вьюхе в allow_request
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, "throttle_scope", None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        ident = self.get_scoped_ident(request)
+        if ident is None:
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": f"{self.ident_kind}:{ident}",
+        }
+
+    def get_scoped_ident(self, request):
+        return self.get_ident(request)
+
+
+class IPRateThrottle(ScopedTokenBucketThrottle):
+    """Ограничение по IP клиента."""
+
+
+class EmailRateThrottle(ScopedTokenBucketThrottle):
+    """Ограничение по email из тела запроса.
+
+    Защищает один аккаунт от перебора паролей с разных адресов.
+    В ключ кэша попадает хеш email, а не строка от клиента.
+    """
+
+    ident_kind = "email"
+
+    def get_scoped_ident(self, request):
+        data = request.data
+        email = data.get("email") if hasattr(data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class UserRateThrottle(ScopedTokenBucketThrottle):
+    ident_kind = "user"
+
+    def get_scoped_ident(self, request):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return request.user.pk
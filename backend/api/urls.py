@@ -1,8 +1,12 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from rest_framework import routers
 
+from rest_framework_simplejwt import views as jwt_views
+
 from .views import (ActivateUser, ClientsViewSet, CustomUserViewSet,
-                    DietPlanViewSet, TrainingPlanViewSet,)
+                    DietPlanViewSet, ExerciseViewSet, LoginView, MealViewSet,
+                    ParamsViewSet, ProductViewSet, TrainingPlanViewSet,)
 
 app_name = 'api'
 
@@ -13,13 +17,32 @@ router.register(
 router.register(r'diet-plans', DietPlanViewSet, basename='diet-plans')
 router.register(r'users', CustomUserViewSet, basename='users')
 router.register(r'clients', ClientsViewSet, basename='clients')
+router.register(r'products', ProductViewSet, basename='products')
+router.register(r'meals', MealViewSet, basename='meals')
+router.register(r'exercises', ExerciseViewSet, basename='exercises')
+router.register(r'params', ParamsViewSet, basename='params')
 
 
 urlpatterns = [
     path('', include(router.urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.social.urls')),
-    path('auth/', include('djoser.urls.jwt')),
+    re_path(r'^auth/jwt/create/?$', LoginView.as_view(), name='jwt-create'),
+    re_path(r'^auth/jwt/refresh/?$', jwt_views.TokenRefreshView.as_view(),
+            name='jwt-refresh'),
+    re_path(r'^auth/jwt/verify/?$', jwt_views.TokenVerifyView.as_view(),
+            name='jwt-verify'),
     path('activate/<uid>/<token>',
          ActivateUser.as_view({'get': 'activation'}), name='activation'),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import (client_detail, clients_list, diet_programs,
+                              workout_programs,)
+
+    urlpatterns = [
+        path('users/get_workout_programs/', workout_programs),
+        path('users/get_diet_programs/', diet_programs),
+        path('clients/', clients_list, name='clients-list'),
+        path('clients/<int:pk>/', client_detail, name='clients-detail'),
+    ] + urlpatterns
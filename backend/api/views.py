@@ -1,49 +1,100 @@
 from django.contrib.auth import get_user_model, update_session_auth_hash
+from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from api.filters import DietPlanFilter, TrainingPlanFilter
 from djoser.conf import settings
 from djoser.views import UserViewSet
-from drf_spectacular.utils import extend_schema
-from users.models import SpecialistClient
-from workouts.models import TrainingPlan
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (OpenApiParameter, extend_schema,
+                                   extend_schema_view,)
+from rest_framework_simplejwt.views import TokenObtainPairView
+from users.models import Params, SpecialistClient
+from users.params import downsample, get_params_series
+from workouts.catalog import get_catalog
+from workouts.models import Exercise, TrainingPlan
 
-from diets.models import DietPlan
+from diets.models import DietPlan, Meals, Products
+from diets.search import search
 
+from .export import CONTENT_TYPES, export_clients
+from .imports import create_clients, read_rows, validate_rows
+from .mixins import (PlanConditionalMixin, PlanResponseCacheMixin,
+                     SparseFieldsetQuerysetMixin,)
+from .pagination import PLAN_CURSOR_ORDERING, SearchPagination
+from .parsers import FastJSONParser
 from .permissions import (ClientOrAdmin, IsCurUserOrTheirSpecialistPermission,
+                          IsCurUserOrTheirSpecialistReadPermission,
                           SpecialistOrAdmin,)
-from .serializers import (ClientAddSerializer, ClientListSerializer,
+from .serializers import (ClientAddSerializer, ClientExportSerializer,
+                          ClientImportRowSerializer, ClientListSerializer,
                           ClientProfileSerializer, CustomUserSerializer,
                           DietListSerializer, DietPlanLinkSerializer,
-                          DietPlanSerializer, TrainingPlanSerializer,
+                          DietPlanSerializer, ExerciseCatalogSerializer,
+                          MealSerializer, MuscleGroupSerializer,
+                          ParamsSerializer, ParamsSeriesPointSerializer,
+                          ParamsSeriesQuerySerializer, ProductSerializer,
+                          TrainingPlanSerializer, TrainingTypeSerializer,
                           UpdateClientSerializer, WorkoutListSerializer,)
 
 User = get_user_model()
 
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields", str, description="Поля ответа через запятую, иначе все"
+    ),
+    OpenApiParameter(
+        "expand", str, description="Связи для раскрытия: user, specialist"
+    ),
+]
 
-class TrainingPlanViewSet(viewsets.ModelViewSet):
+
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
+)
+class TrainingPlanViewSet(
+    PlanConditionalMixin,
+    PlanResponseCacheMixin,
+    SparseFieldsetQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     """Функции для работы с планами тренировок"""
 
     serializer_class = TrainingPlanSerializer
     queryset = TrainingPlan.objects.all()
     permission_classes = [IsCurUserOrTheirSpecialistPermission]
+    cursor_ordering = PLAN_CURSOR_ORDERING
     filter_backends = [DjangoFilterBackend]
     filterset_class = TrainingPlanFilter
     http_method_names = ["get", "post", "put", "delete"]
 
 
-class DietPlanViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=SPARSE_FIELDSET_PARAMETERS),
+)
+class DietPlanViewSet(
+    PlanConditionalMixin,
+    PlanResponseCacheMixin,
+    SparseFieldsetQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     """Функции для работы с планами питания"""
 
     serializer_class = DietPlanSerializer
     queryset = DietPlan.objects.all()
     permission_classes = [IsCurUserOrTheirSpecialistPermission]
+    cursor_ordering = PLAN_CURSOR_ORDERING
     filter_backends = [DjangoFilterBackend]
     filterset_class = DietPlanFilter
     http_method_names = ["get", "post", "put", "delete"]
@@ -52,15 +103,197 @@ class DietPlanViewSet(viewsets.ModelViewSet):
     def send_link(self, request, pk=None):
         """Генерация ссылки и отправка плана питания."""
         diet_plan = self.get_object()
-        link = "http://127.0.0.1:8000/api/diet-plans/{0}".format(diet_plan.pk)
-        # В этой части нужно реализовать логику отправки, например,
-        # отправку письма или сообщения
+        link = request.build_absolute_uri(
+            reverse("api:diet-plans-detail", args=[diet_plan.pk])
+        )
         serializer = DietPlanLinkSerializer(
             data={"diet_plan_id": diet_plan.pk, "link": link}
         )
-        if serializer.is_valid():
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        if diet_plan.user is not None:
+            # Письмо попадает в очередь notifications и отправляется
+            # фоновым обработчиком, запрос не ждет почтовый сервер.
+            send_mail(
+                subject=f"План питания «{diet_plan.name}»",
+                message=(
+                    "Специалист подготовил для вас план питания "
+                    f"«{diet_plan.name}».\nОткрыть план: {link}"
+                ),
+                from_email=None,
+                recipient_list=[diet_plan.user.email],
+            )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter("search", str, description="Строка поиска"),
+    ]
+)
+class CatalogSearchViewSet(viewsets.ReadOnlyModelViewSet):
+    """Базовый вьюсет справочника с поиском по названию.
+
+    Query parameter search включает поиск по индексам (diets.search),
+    без него записи выводятся по алфавиту.
+    """
+
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        queryset = self.queryset.all()
+        query = self.request.query_params.get("search", "").strip()
+        if self.action == "list" and query:
+            return search(queryset, query)
+        return queryset.order_by("name", "pk")
+
+
+class ProductViewSet(CatalogSearchViewSet):
+    """Справочник продуктов"""
+
+    serializer_class = ProductSerializer
+    queryset = Products.objects.only(
+        "id", "name", "kkal", "protein", "carbo", "fat", "photo"
+    )
+
+
+class MealViewSet(CatalogSearchViewSet):
+    """Справочник блюд"""
+
+    serializer_class = MealSerializer
+    queryset = Meals.objects.only(
+        "id",
+        "name",
+        "photo",
+        "kkal_total",
+        "protein_total",
+        "carbo_total",
+        "fat_total",
+    )
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter(
+            "muscle",
+            str,
+            description="Группа мышц, можно указать несколько через запятую",
+        ),
+        OpenApiParameter(
+            "role",
+            str,
+            enum=["target", "auxiliary"],
+            description="Учитывать только целевые или вспомогательные мышцы",
+        ),
+        OpenApiParameter("type", int, description="id типа тренировки"),
+        OpenApiParameter("search", str, description="Часть названия"),
+    ],
+    responses=ExerciseCatalogSerializer,
+)
+class ExerciseViewSet(viewsets.GenericViewSet):
+    """Каталог упражнений с фильтрами по группам мышц и типу тренировки.
+
+    Данные берутся из каталога в памяти процесса (workouts.catalog),
+    запрос к БД выполняется только после изменения упражнений.
+    """
+
+    queryset = Exercise.objects.none()
+    serializer_class = ExerciseCatalogSerializer
+    pagination_class = SearchPagination
+    roles = {"target": True, "auxiliary": False}
+
+    def list(self, request):
+        params = request.query_params
+        muscles = [
+            muscle
+            for value in params.getlist("muscle")
+            for muscle in value.split(",")
+            if muscle.strip()
+        ]
+        try:
+            training_type = params.get("type")
+            training_type = training_type and int(training_type)
+            role = self.roles[params["role"]] if "role" in params else None
+        except (ValueError, KeyError):
+            raise ValidationError(
+                "Неверное значение параметра type или role."
+            )
+        exercises = get_catalog().filter(
+            muscles=muscles,
+            role=role,
+            training_type=training_type,
+            search=params.get("search", ""),
+        )
+        page = self.paginate_queryset(exercises)
+        return self.get_paginated_response(page)
+
+    def retrieve(self, request, pk=None):
+        try:
+            return Response(get_catalog().exercises[int(pk)])
+        except (KeyError, ValueError):
+            raise NotFound()
+
+    @extend_schema(parameters=[], responses=MuscleGroupSerializer(many=True))
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def muscle_groups(self, request):
+        """Справочник групп мышц"""
+        return Response(get_catalog().muscle_groups)
+
+    @extend_schema(parameters=[], responses=TrainingTypeSerializer(many=True))
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def training_types(self, request):
+        """Справочник типов тренировок"""
+        return Response(get_catalog().training_types)
+
+
+class ParamsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """История параметров пользователя, от новых к старым"""
+
+    serializer_class = ParamsSerializer
+    permission_classes = [IsCurUserOrTheirSpecialistReadPermission]
+    cursor_ordering = ("-created_at", "-id")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "user", str, description="id пользователя, по умолчанию свой"
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        user_id = self.request.query_params.get("user") or self.request.user.pk
+        return Params.objects.filter(user_id=user_id)
+
+    @extend_schema(
+        parameters=[ParamsSeriesQuerySerializer],
+        responses=ParamsSeriesPointSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def series(self, request):
+        """Динамика параметра по периодам для графиков.
+
+        Агрегаты считаются в БД, длинный ряд прореживается до points
+        точек.
+        """
+        query = ParamsSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        options = query.validated_data
+        points = get_params_series(
+            options.get("user") or request.user.pk,
+            options["metric"],
+            options["period"],
+            options.get("date_from"),
+            options.get("date_to"),
+        )
+        serializer = ParamsSeriesPointSerializer(
+            downsample(points, options["points"]), many=True
+        )
+        return Response(serializer.data)
 
 
 class CustomUserViewSet(UserViewSet):
@@ -68,9 +301,24 @@ class CustomUserViewSet(UserViewSet):
 
     serializer_class = CustomUserSerializer
     permission_classes = settings.PERMISSIONS.user
+    cursor_ordering = ("-created_at", "-id")
+    # Действия с хешированием пароля (см. api.throttling)
+    throttle_scopes = {
+        "create": "register",
+        "user_restore": "password",
+        "set_password": "password",
+        "set_username": "password",
+        "reset_password_confirm": "password",
+    }
 
     def get_queryset(self):
-        return User.objects.all()
+        return User.objects.select_related(
+            "current_params"
+        ).prefetch_related("specialist")
+
+    def get_throttles(self):
+        self.throttle_scope = self.throttle_scopes.get(self.action)
+        return super().get_throttles()
 
     def destroy(self, request, *args, **kwargs):
         """Вместо удаления меняется флаг is_active"""
@@ -109,19 +357,37 @@ class CustomUserViewSet(UserViewSet):
             update_session_auth_hash(self.request, self.request.user)
         return Response(status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=["get"], permission_classes=[ClientOrAdmin])
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[ClientOrAdmin],
+        cursor_ordering=PLAN_CURSOR_ORDERING,
+    )
     def get_workout_programs(self, serializer):
         """Вывод программ тренировок клиента"""
         programs = TrainingPlan.objects.filter(user=self.request.user)
-        serializer = WorkoutListSerializer(programs, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        page = self.paginate_queryset(programs)
+        serializer = WorkoutListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-    @action(detail=False, methods=["get"], permission_classes=[ClientOrAdmin])
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[ClientOrAdmin],
+        cursor_ordering=PLAN_CURSOR_ORDERING,
+    )
     def get_diet_programs(self, serializer):
         """Вывод программ питания клиента"""
         programs = DietPlan.objects.filter(user=self.request.user)
-        serializer = DietListSerializer(programs, many=True)
-        return Response(data=serializer.data, status=status.HTTP_200_OK)
+        page = self.paginate_queryset(programs)
+        serializer = DietListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class LoginView(TokenObtainPairView):
+    """Выдача JWT по email и паролю"""
+
+    throttle_scope = "login"
 
 
 class ActivateUser(UserViewSet):
@@ -145,6 +411,7 @@ class ClientsViewSet(viewsets.ModelViewSet):
     """Функции для работы с клиентами"""
 
     permission_classes = (SpecialistOrAdmin,)
+    cursor_ordering = ("-created_at", "-id")
 
     def perform_create(self, serializer):
         return serializer.save(specialist=self.request.user)
@@ -164,15 +431,74 @@ class ClientsViewSet(viewsets.ModelViewSet):
     )
     def retrieve(self, request, pk=None):
         """Получения карточки клиента"""
-        user = get_object_or_404(
-            SpecialistClient, id=pk, specialist=request.user
-        )
+        client = get_object_or_404(self.get_queryset(), id=pk)
         serializer = ClientProfileSerializer(
-            user, context={"request": request}
+            client, context={"request": request}
         )
         profile_data = serializer.data
         return Response(profile_data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "output",
+                str,
+                enum=list(CONTENT_TYPES),
+                description="Формат выгрузки, по умолчанию ndjson",
+            ),
+        ],
+        responses={(200, content_type): bytes for content_type in (
+            CONTENT_TYPES.values()
+        )},
+    )
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def export(self, request):
+        """Потоковая выгрузка всех клиентов специалиста"""
+        output = request.query_params.get("output", "ndjson")
+        if output not in CONTENT_TYPES:
+            raise ValidationError("Допустимые форматы: ndjson, csv.")
+        return export_clients(
+            self.get_queryset(),
+            ClientExportSerializer,
+            self.get_serializer_context(),
+            output,
+        )
+
+    @extend_schema(
+        request={
+            "application/json": ClientImportRowSerializer(many=True),
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            },
+        },
+        responses={201: OpenApiTypes.OBJECT, 400: OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[FastJSONParser, MultiPartParser],
+    )
+    def import_clients(self, request):
+        """Пакетный импорт клиентов из JSON-массива или CSV-файла"""
+        rows, errors = validate_rows(read_rows(request))
+        if errors:
+            return Response(
+                {"errors": errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        created = create_clients(request.user, rows)
+        return Response({"created": created}, status=status.HTTP_201_CREATED)
+
     def get_queryset(self):
         user = self.request.user
-        return SpecialistClient.objects.filter(specialist=user)
+        queryset = SpecialistClient.objects.filter(specialist=user)
+        if self.action == "export":
+            return ClientExportSerializer.setup_eager_loading(
+                queryset
+            ).order_by("created_at", "id")
+        if self.action == "retrieve":
+            return ClientProfileSerializer.setup_eager_loading(queryset)
+        if self.action == "list":
+            return ClientListSerializer.setup_eager_loading(queryset)
+        return queryset
@@ -61,6 +61,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
 ]
@@ -80,21 +81,27 @@ INSTALLED_APPS += [
 INSTALLED_APPS += [
     'api.apps.ApiConfig',
     'diets.apps.DietsConfig',
+    'notifications.apps.NotificationsConfig',
     'users.apps.UsersConfig',
     'workouts.apps.WorkoutsConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.StatelessSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'api.middleware.StatelessCsrfViewMiddleware',
+    'api.middleware.StatelessAuthenticationMiddleware',
+    'api.middleware.StatelessMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 ]
 
+# Запросы к API без сессий, CSRF и сообщений (см. api.middleware).
+# Социальная авторизация хранит state OAuth в сессии.
+STATELESS_PATH_PREFIXES = ('/api/',)
+STATEFUL_PATH_PREFIXES = ('/api/auth/o/',)
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -117,6 +124,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# wsgi - синхронные воркеры gunicorn, asgi - воркеры uvicorn
+# (см. gunicorn.conf.py). В режиме asgi GET-запросы программ
+# пользователя и клиентов обслуживают асинхронные вьюхи api.async_views.
+SERVER_MODE = os.getenv('SERVER_MODE', default='wsgi')
+ASYNC_READ_VIEWS = SERVER_MODE == 'asgi'
+
 if os.getenv("DEVELOPMENT") == 'True':
     DATABASES = {
         'default': {
@@ -134,11 +147,59 @@ else:
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
             'HOST': os.getenv('DB_HOST', default='localhost'),
             'PORT': os.getenv('DB_PORT', default='5432'),
+            # Постоянные соединения: сколько секунд соединение живет
+            # между запросами (0 - закрывать после каждого запроса).
+            # В режиме asgi каждый запрос идет в своем потоке, поэтому
+            # по умолчанию соединения там не переиспользуются.
+            'CONN_MAX_AGE': int(os.getenv(
+                'DB_CONN_MAX_AGE',
+                default=0 if SERVER_MODE == 'asgi' else 60,
+            )),
+            'CONN_HEALTH_CHECKS': os.getenv(
+                'DB_CONN_HEALTH_CHECKS', default='True') == 'True',
+            # За pgbouncer в режиме pool_mode=transaction серверные
+            # курсоры (QuerySet.iterator) не переживают транзакцию.
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv(
+                'DB_PGBOUNCER', default='False') == 'True',
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv(
+                    'DB_CONNECT_TIMEOUT', default=5)),
+            },
         },
     }
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+###########################
+#  CACHE
+###########################
+# Общий кэш нужен для согласованной инвалидации между воркерами:
+# Redis, если задан REDIS_URL, иначе файловый кэш в CACHE_LOCATION,
+# иначе локальная память процесса (разработка и тесты).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'wellcoach',
+        }
+    }
+elif os.getenv('CACHE_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+PLAN_CACHE_TIMEOUT = int(os.getenv('PLAN_CACHE_TIMEOUT', default=60 * 10))
+
 LOGOUT_REDIRECT_URL = '/api/'
 
 ###########################
@@ -152,15 +213,40 @@ USE_TZ = True
 ###########################
 #  DJANGO REST FRAMEWORK
 ###########################
+# Права пользователя из claims JWT вместо чтения User на каждый запрос
+# (см. users.tokens). False - обычная JWTAuthentication simplejwt.
+JWT_USER_CLAIMS = os.getenv('JWT_USER_CLAIMS', default='True') == 'True'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES':
         ('rest_framework.permissions.IsAuthenticated',),
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.SessionAuthentication'],
+        'users.authentication.ClaimsJWTAuthentication'
+        if JWT_USER_CLAIMS else
+        'rest_framework_simplejwt.authentication.JWTAuthentication'],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    # JSON через orjson, без него - стандартные классы DRF
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer'],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser'],
+    # Ограничения действуют только для вьюх с throttle_scope
+    # (см. api.throttling)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.IPRateThrottle',
+        'api.throttling.EmailRateThrottle',
+        'api.throttling.UserRateThrottle'],
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_LOGIN_RATE', default='10/min'),
+        'password': os.getenv('THROTTLE_PASSWORD_RATE', default='5/min'),
+        'register': os.getenv('THROTTLE_REGISTER_RATE', default='10/hour')},
+    # IP клиента из X-Forwarded-For, который выставляет gateway
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
     "DEFAULT_SCHEMA_CLASS": "drf_standardized_errors.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "drf_standardized_errors.handler.exception_handler",
 }
@@ -171,6 +257,9 @@ REST_FRAMEWORK = {
 # with open("../common_errors.md") as f:
 #     description = f.read()
 
+# Готовая схема для /api/schema/ (manage.py generate_schema)
+SCHEMA_FILE = os.getenv('SCHEMA_FILE', default=BASE_DIR / 'openapi.json')
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "WellCoach",
     "VERSION": "0.0.1",
@@ -214,12 +303,23 @@ MEDIA_ROOT = '/app/media'
 #########
 #  Email
 #########
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Письма из запросов складываются в очередь (notifications.OutgoingEmail),
+# отправляет их команда send_queued_emails через OUTBOX_DELIVERY_BACKEND.
+# Для разработки подойдет console или filebased бэкенд.
+EMAIL_BACKEND = 'notifications.backends.OutboxEmailBackend'
+OUTBOX_DELIVERY_BACKEND = os.getenv(
+    'OUTBOX_DELIVERY_BACKEND',
+    default='django.core.mail.backends.smtp.EmailBackend',
+)
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', default=50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=5))
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', default=BASE_DIR / 'sent_emails')
 EMAIL_HOST = 'smtp.yandex.ru'
 EMAIL_PORT = 465
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_SSL = True
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', default=30))
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
 EMAIL_ADMIN = EMAIL_HOST_USER
@@ -251,6 +351,9 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'TOKEN_OBTAIN_SERIALIZER':
+        'users.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.ClaimsTokenRefreshSerializer',
 }
 
 JWT_AUTH = {
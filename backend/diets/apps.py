@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class DietsConfig(AppConfig):
     name = 'diets'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import create_search_indexes
+
+        post_migrate.connect(create_search_indexes, sender=self)
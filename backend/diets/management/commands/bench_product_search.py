@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import random
+import statistics
+import time
+
+from api.views import ProductViewSet
+
+from diets.models import Products
+
+User = get_user_model()
+
+WORDS = (
+    "гречка", "рис", "овсянка", "курица", "индейка", "говядина", "треска",
+    "лосось", "творог", "кефир", "йогурт", "сыр", "яйцо", "хлеб", "батон",
+    "томат", "огурец", "капуста", "морковь", "свекла", "яблоко", "груша",
+    "банан", "апельсин", "миндаль", "фундук", "масло", "молоко", "сметана",
+    "фасоль", "нут", "чечевица", "булгур", "киноа", "макароны", "картофель",
+)
+STYLES = (
+    "отварной", "запеченный", "свежий", "сушеный", "копченый", "тушеный",
+    "замороженный", "консервированный", "цельнозерновой", "обезжиренный",
+)
+QUERIES = ("греч", "кур", "лосось копч", "творог обез", "яблок", "масло",
+           "чечев", "сыр", "картофель зап", "киноа")
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер времени поиска по справочнику продуктов через "
+        "/api/products/?search= на синтетическом каталоге. Данные "
+        "создаются в транзакции и откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--budget-ms", type=float, default=50.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options["products"])
+            timings = self.measure(options["repeat"])
+            transaction.set_rollback(True)
+        self.report(timings, options["budget_ms"])
+
+    def populate(self, count):
+        rng = random.Random(0)
+        Products.objects.bulk_create(
+            (
+                Products(
+                    name="{} {} {}".format(
+                        rng.choice(WORDS), rng.choice(STYLES), number
+                    ),
+                    kkal=rng.randint(0, 900),
+                    protein=rng.randint(0, 90),
+                    carbo=rng.randint(0, 90),
+                    fat=rng.randint(0, 90),
+                    describe="",
+                )
+                for number in range(count)
+            ),
+            batch_size=5000,
+        )
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Products._meta.db_table}")
+        self.stdout.write(f"Создано продуктов: {count}")
+
+    def measure(self, repeat):
+        user = User(email="bench@example.com", is_specialist=True)
+        view = ProductViewSet.as_view({"get": "list"})
+        factory = APIRequestFactory()
+        timings = {}
+        for query in QUERIES:
+            samples = []
+            for _ in range(repeat):
+                request = factory.get("/api/products/", {"search": query})
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                samples.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"Поиск {query!r} вернул {response.status_code}"
+                    )
+            timings[query] = samples
+        return timings
+
+    def report(self, timings, budget):
+        worst = 0
+        for query, samples in timings.items():
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            worst = max(worst, p95)
+            self.stdout.write(
+                f"{query:<16} median {statistics.median(samples):7.2f} ms"
+                f"   p95 {p95:7.2f} ms"
+            )
+        if worst > budget:
+            raise CommandError(
+                f"p95 {worst:.2f} ms превышает бюджет {budget:.0f} ms"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"p95 {worst:.2f} ms в пределах {budget:.0f} ms"
+            )
+        )
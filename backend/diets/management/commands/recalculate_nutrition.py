@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from diets.nutrition import recalculate_all
+
+
+class Command(BaseCommand):
+    help = "Полный пересчет сумм КБЖУ блюд, дней диеты и планов питания"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recalculate_all()
+        self.stdout.write(self.style.SUCCESS("Суммы КБЖУ пересчитаны."))
@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.validators import MaxValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from config.settings import (CARBO_MAX_PER_DAY, FAT_MAX_PER_DAY,
@@ -9,6 +9,34 @@ from config.settings import (CARBO_MAX_PER_DAY, FAT_MAX_PER_DAY,
 User = get_user_model()
 
 
+class NutritionTotals(models.Model):
+    """Рассчитанные суммы КБЖУ, обновляются diets.nutrition."""
+
+    kkal_total = models.FloatField(
+        verbose_name='Калорийность (расчет)',
+        default=0,
+        editable=False,
+    )
+    protein_total = models.FloatField(
+        verbose_name='Белки (расчет)',
+        default=0,
+        editable=False,
+    )
+    carbo_total = models.FloatField(
+        verbose_name='Углеводы (расчет)',
+        default=0,
+        editable=False,
+    )
+    fat_total = models.FloatField(
+        verbose_name='Жиры (расчет)',
+        default=0,
+        editable=False,
+    )
+
+    class Meta:
+        abstract = True
+
+
 class MealsType(models.Model):
     name = models.CharField(
         verbose_name='Название типа питания',
@@ -44,16 +72,16 @@ class Products(models.Model):
         max_length=settings.OTHER_MAX_LENGTH,
     )
     kkal = models.PositiveIntegerField(
-        verbose_name='Калорийность'
+        verbose_name='Калорийность на 100 г'
     )
     protein = models.PositiveIntegerField(
-        verbose_name='Белки'
+        verbose_name='Белки на 100 г'
     )
     carbo = models.PositiveIntegerField(
-        verbose_name='Углеводы'
+        verbose_name='Углеводы на 100 г'
     )
     fat = models.PositiveIntegerField(
-        verbose_name='Жиры'
+        verbose_name='Жиры на 100 г'
     )
     photo = models.ImageField(
         blank=True,
@@ -79,12 +107,15 @@ class Products(models.Model):
         ordering = ['-create_dt']
         verbose_name = 'Продукт'
         verbose_name_plural = 'Продукты'
+        indexes = [
+            models.Index(fields=['name'], name='diets_products_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Meals(models.Model):
+class Meals(NutritionTotals):
     name = models.CharField(
         verbose_name='Название блюда',
         max_length=settings.OTHER_MAX_LENGTH,
@@ -128,6 +159,9 @@ class Meals(models.Model):
         ordering = ['-create_dt']
         verbose_name = 'Справочник блюд'
         verbose_name_plural = 'Справочник блюд'
+        indexes = [
+            models.Index(fields=['name'], name='diets_meals_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -165,7 +199,7 @@ class MealsList(models.Model):
         verbose_name_plural = 'Список блюд'
 
 
-class Diets(models.Model):
+class Diets(NutritionTotals):
     weekday = models.CharField(
         max_length=settings.NAME_MAX_LENGTH,
         blank=True,
@@ -226,7 +260,7 @@ class Diets(models.Model):
         verbose_name_plural = 'Диета'
 
 
-class DietPlan(models.Model):
+class DietPlan(NutritionTotals):
     kkal = models.PositiveIntegerField(
         verbose_name='Калорийность',
         validators=[
@@ -264,6 +298,8 @@ class DietPlan(models.Model):
         on_delete=models.CASCADE,
         related_name='diet_plan_spec',
         verbose_name='Специалист',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
         # null=True
     )
     user = models.ForeignKey(
@@ -271,6 +307,8 @@ class DietPlan(models.Model):
         on_delete=models.CASCADE,
         related_name='diet_plan_user',
         verbose_name='Клиент',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
         # null=True
     )
     diet = models.ManyToManyField(
@@ -328,6 +366,16 @@ class DietPlan(models.Model):
         ordering = ['-create_dt']
         verbose_name = 'План питания'
         verbose_name_plural = 'План питания'
+        indexes = [
+            models.Index(
+                fields=['user', '-create_dt', '-id'],
+                name='diets_dp_user_create_idx',
+            ),
+            models.Index(
+                fields=['specialist', '-create_dt', '-id'],
+                name='diets_dp_spec_create_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -371,6 +419,11 @@ class MealProduct(models.Model):
         related_name='products_meals',
         null=True
     )
+    quantity = models.FloatField(
+        verbose_name='Количество продукта, г',
+        validators=[MinValueValidator(0)],
+        default=100,
+    )
     create_dt = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания',
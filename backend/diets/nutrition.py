@@ -0,0 +1,110 @@
+"""Расчет сумм КБЖУ блюд, дней диеты и планов питания.
+
+Суммы считаются агрегирующими подзапросами внутри одного UPDATE на
+каждый уровень: блюдо (продукты с учетом количества, значения
+продуктов указаны на 100 г), день диеты (блюда из списков блюд дня),
+план питания (дни плана). Пересчитываются только переданные объекты
+и зависящие от них объекты следующих уровней.
+"""
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Now
+from django.dispatch import Signal
+
+from .models import (DietPlan, DietPlanDiet, Diets, DietsMealsList,
+                     MealProduct, Meals,)
+
+MACROS = ("kkal", "protein", "carbo", "fat")
+
+# Отправляется после UPDATE сумм планов, аргумент plan_ids.
+diet_plan_totals_changed = Signal()
+
+
+def total_subquery(queryset, group_field, expression):
+    """Сумма expression по строкам queryset, связанным с OuterRef("pk")."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_field: OuterRef("pk")})
+            .order_by()
+            .values(group_field)
+            .annotate(total=Sum(expression, output_field=FloatField()))
+            .values("total")
+        ),
+        0.0,
+        output_field=FloatField(),
+    )
+
+
+def clean_ids(ids):
+    return {pk for pk in ids if pk is not None}
+
+
+def recalculate_meals(meal_ids, cascade=True):
+    meal_ids = clean_ids(meal_ids)
+    if not meal_ids:
+        return
+    Meals.objects.filter(pk__in=meal_ids).update(
+        **{
+            f"{macro}_total": total_subquery(
+                MealProduct.objects.all(),
+                "meal",
+                F(f"product__{macro}") * F("quantity") / 100.0,
+            )
+            for macro in MACROS
+        }
+    )
+    if not cascade:
+        return
+    recalculate_diets(
+        DietsMealsList.objects.filter(
+            meals_list__meal__in=meal_ids
+        ).values_list("diet_id", flat=True)
+    )
+
+
+def recalculate_diets(diet_ids, cascade=True):
+    diet_ids = clean_ids(diet_ids)
+    if not diet_ids:
+        return
+    Diets.objects.filter(pk__in=diet_ids).update(
+        edit_dt=Now(),
+        **{
+            f"{macro}_total": total_subquery(
+                DietsMealsList.objects.all(),
+                "diet",
+                F(f"meals_list__meal__{macro}_total"),
+            )
+            for macro in MACROS
+        },
+    )
+    if not cascade:
+        return
+    recalculate_plans(
+        DietPlanDiet.objects.filter(diet__in=diet_ids).values_list(
+            "diet_plan_id", flat=True
+        )
+    )
+
+
+def recalculate_plans(plan_ids):
+    plan_ids = clean_ids(plan_ids)
+    if not plan_ids:
+        return
+    DietPlan.objects.filter(pk__in=plan_ids).update(
+        edit_dt=Now(),
+        **{
+            f"{macro}_total": total_subquery(
+                DietPlanDiet.objects.all(),
+                "diet_plan",
+                F(f"diet__{macro}_total"),
+            )
+            for macro in MACROS
+        },
+    )
+    diet_plan_totals_changed.send(sender=DietPlan, plan_ids=plan_ids)
+
+
+def recalculate_all():
+    """Полный пересчет всех сумм, например после загрузки данных."""
+    recalculate_meals(Meals.objects.values_list("pk", flat=True), False)
+    recalculate_diets(Diets.objects.values_list("pk", flat=True), False)
+    recalculate_plans(DietPlan.objects.values_list("pk", flat=True))
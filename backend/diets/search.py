@@ -0,0 +1,150 @@
+"""Поиск по справочникам продуктов и блюд.
+
+В PostgreSQL используются триграммные GIN индексы (pg_trgm) по полю
+name: подстрока и нечеткое совпадение, ранжирование по совпадению
+начала названия и триграммной близости. В SQLite для разработки
+используется полнотекстовая таблица FTS5 с префиксным поиском по
+словам, которую поддерживают триггеры.
+"""
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Lookup, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+import re
+
+from .models import Meals, Products
+
+SEARCH_MODELS = (Products, Meals)
+
+POSTGRES_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS {table}_name_trgm "
+    "ON {table} USING gin (name gin_trgm_ops)"
+)
+SQLITE_FTS_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+    "name, content='{table}', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_insert "
+    "AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {table}_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_delete "
+    "AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS {table}_fts_update "
+    "AFTER UPDATE OF name ON {table} BEGIN "
+    "INSERT INTO {table}_fts({table}_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    "INSERT INTO {table}_fts(rowid, name) VALUES (new.id, new.name); END",
+    "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+)
+
+
+class ILike(Lookup):
+    """Регистронезависимый LIKE по полю без приведения к UPPER.
+
+    icontains в PostgreSQL компилируется в UPPER(name::text) LIKE, что
+    не совпадает с выражением индекса gin_trgm_ops, а ILIKE по самому
+    полю этот индекс использует.
+    """
+
+    lookup_name = "ilike"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", lhs_params + rhs_params
+
+
+def create_search_indexes(using="default", **kwargs):
+    """Создание поисковых индексов, обработчик сигнала post_migrate.
+
+    Выполняется после миграций, так как при пересоздании таблиц
+    SQLite удаляет триггеры, а миграции приложения не хранятся
+    в репозитории.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            statements = (POSTGRES_INDEX_SQL,)
+        elif connection.vendor == "sqlite" and has_fts5(cursor):
+            statements = SQLITE_FTS_SQL
+        else:
+            return
+        for model in SEARCH_MODELS:
+            for statement in statements:
+                cursor.execute(statement.format(table=model._meta.db_table))
+
+
+def has_fts5(cursor):
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cursor.fetchone()[0])
+
+
+def fts_table_exists(connection, table):
+    """Проверка наличия FTS таблицы, результат запоминается."""
+    cache = getattr(connection, "search_fts_tables", None)
+    if cache is None:
+        cache = connection.search_fts_tables = {}
+    if table not in cache:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = %s",
+                [f"{table}_fts"],
+            )
+            cache[table] = cursor.fetchone() is not None
+    return cache[table]
+
+
+def fts_query(query):
+    """Префиксный запрос FTS5 по всем словам строки поиска."""
+    return " ".join(
+        '"{}"*'.format(word) for word in re.findall(r"\w+", query)
+    )
+
+
+def search(queryset, query):
+    """Отфильтрованный и отсортированный по релевантности queryset."""
+    query = query.strip()
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    prefix_rank = Case(
+        When(name__istartswith=query, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        pattern = f"%{connection.ops.prep_for_like_query(query)}%"
+        return (
+            queryset.filter(
+                Q(ILike(F("name"), pattern))
+                | Q(name__trigram_similar=query)
+            )
+            .annotate(
+                prefix_rank=prefix_rank,
+                similarity=TrigramSimilarity("name", query),
+            )
+            .order_by("prefix_rank", "-similarity", "name", "pk")
+        )
+    match = fts_query(query)
+    if (
+        connection.vendor == "sqlite"
+        and match
+        and fts_table_exists(connection, table)
+    ):
+        queryset = queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s",
+                [match],
+            )
+        )
+    else:
+        queryset = queryset.filter(name__icontains=query)
+    return queryset.annotate(
+        prefix_rank=prefix_rank, name_length=Length("name")
+    ).order_by("prefix_rank", "name_length", "name", "pk")
@@ -0,0 +1,90 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import (DietPlanDiet, Diets, DietsMealsList, MealProduct, Meals,
+                     MealsList, Products,)
+from .nutrition import recalculate_diets, recalculate_meals, recalculate_plans
+
+
+@receiver(post_save, sender=MealProduct)
+@receiver(post_delete, sender=MealProduct)
+def recalculate_meal_totals(sender, instance, **kwargs):
+    recalculate_meals([instance.meal_id])
+
+
+@receiver(post_save, sender=Products)
+def recalculate_product_meals(sender, instance, created, **kwargs):
+    if created:
+        return
+    recalculate_meals(
+        MealProduct.objects.filter(product=instance).values_list(
+            "meal_id", flat=True
+        )
+    )
+
+
+@receiver(pre_delete, sender=Products)
+def remember_product_meals(sender, instance, **kwargs):
+    """Связи с продуктом обнуляются при удалении, запоминаем блюда."""
+    instance.affected_meal_ids = list(
+        MealProduct.objects.filter(product=instance).values_list(
+            "meal_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Products)
+def recalculate_deleted_product_meals(sender, instance, **kwargs):
+    recalculate_meals(getattr(instance, "affected_meal_ids", []))
+
+
+@receiver(pre_delete, sender=Meals)
+@receiver(pre_delete, sender=MealsList)
+def remember_meal_diets(sender, instance, **kwargs):
+    lookup = "meals_list__meal" if sender is Meals else "meals_list"
+    instance.affected_diet_ids = list(
+        DietsMealsList.objects.filter(**{lookup: instance}).values_list(
+            "diet_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Meals)
+@receiver(post_delete, sender=MealsList)
+def recalculate_deleted_meal_diets(sender, instance, **kwargs):
+    recalculate_diets(getattr(instance, "affected_diet_ids", []))
+
+
+@receiver(post_save, sender=MealsList)
+def recalculate_meals_list_diets(sender, instance, **kwargs):
+    recalculate_diets(
+        DietsMealsList.objects.filter(meals_list=instance).values_list(
+            "diet_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=DietsMealsList)
+@receiver(post_delete, sender=DietsMealsList)
+def recalculate_diet_totals(sender, instance, **kwargs):
+    recalculate_diets([instance.diet_id])
+
+
+@receiver(pre_delete, sender=Diets)
+def remember_diet_plans(sender, instance, **kwargs):
+    instance.affected_plan_ids = list(
+        DietPlanDiet.objects.filter(diet=instance).values_list(
+            "diet_plan_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Diets)
+def recalculate_deleted_diet_plans(sender, instance, **kwargs):
+    recalculate_plans(getattr(instance, "affected_plan_ids", []))
+
+
+@receiver(post_save, sender=DietPlanDiet)
+@receiver(post_delete, sender=DietPlanDiet)
+def recalculate_plan_totals(sender, instance, **kwargs):
+    recalculate_plans([instance.diet_plan_id])
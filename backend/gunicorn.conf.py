@@ -0,0 +1,37 @@
+"""Настройки gunicorn.
+
+SERVER_MODE=wsgi (по умолчанию) - синхронные воркеры и config.wsgi,
+SERVER_MODE=asgi - воркеры uvicorn и config.asgi, в этом режиме
+часть эндпоинтов чтения обслуживают асинхронные вьюхи.
+"""
+import os
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:9000')
+# Каждый воркер держит свое соединение с PostgreSQL (CONN_MAX_AGE),
+# поэтому число воркеров по умолчанию ограничено.
+MAX_DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    """2 * CPU + 1 по процессорам, доступным процессу, не больше 4.
+
+    cpu_count() в контейнере возвращает число процессоров хоста.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return min(cpus * 2 + 1, MAX_DEFAULT_WORKERS)
+
+
+workers = int(os.getenv('GUNICORN_WORKERS', default_workers()))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'sync'
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+import base64
+
+from .models import OutgoingEmail
+
+
+def serialize_attachments(message):
+    """Вложения письма для JSON, None если их нельзя сохранить.
+
+    Вложения MIMEBase (message.attach(mime_object)) в очередь не
+    попадают.
+    """
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            return None
+        filename, content, mimetype = attachment
+        is_binary = isinstance(content, bytes)
+        if is_binary:
+            content = base64.b64encode(content).decode('ascii')
+        attachments.append({
+            'filename': filename,
+            'content': content,
+            'mimetype': mimetype,
+            'base64': is_binary,
+        })
+    return attachments
+
+
+def to_outgoing_email(message):
+    """OutgoingEmail по письму, None если письмо нельзя сохранить."""
+    alternatives = [
+        [content, mimetype]
+        for content, mimetype in getattr(message, 'alternatives', ())
+    ]
+    attachments = serialize_attachments(message)
+    if attachments is None or not all(
+        isinstance(content, str) for content, _ in alternatives
+    ):
+        return None
+    return OutgoingEmail(
+        subject=message.subject,
+        body=message.body,
+        content_subtype=message.content_subtype,
+        alternatives=alternatives,
+        attachments=attachments,
+        from_email=message.from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, сохраняющий письма в очередь OutgoingEmail.
+
+    Запрос не ждет SMTP: письма отправляет команда send_queued_emails
+    через бэкенд из настройки OUTBOX_DELIVERY_BACKEND. Письма, которые
+    нельзя сохранить в очередь, сразу отправляются этим бэкендом.
+    """
+
+    def send_messages(self, email_messages):
+        emails, direct = [], []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            email = to_outgoing_email(message)
+            if email is None:
+                direct.append(message)
+            else:
+                emails.append(email)
+        OutgoingEmail.objects.bulk_create(emails)
+        sent = len(emails)
+        if direct:
+            connection = get_connection(
+                settings.OUTBOX_DELIVERY_BACKEND,
+                fail_silently=self.fail_silently,
+            )
+            sent += connection.send_messages(direct) or 0
+        return sent
@@ -0,0 +1,109 @@
+"""Отправка писем из очереди OutgoingEmail.
+
+Пачка писем выбирается в короткой транзакции с блокировкой строк
+(SKIP LOCKED, где поддерживается) и берется в аренду: send_after
+сдвигается на LEASE_TIME, поэтому другие обработчики ее не выберут.
+Отправка идет вне транзакции через одно соединение с почтовым
+сервером, так что медленный сервер не держит блокировки и транзакцию.
+Если обработчик упал, письма снова выбираются после окончания аренды.
+Неудачные письма откладываются с нарастающей паузой и после
+OUTBOX_MAX_ATTEMPTS попыток помечаются failed.
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.utils import timezone
+
+import base64
+import datetime
+
+from .models import OutgoingEmail
+
+RETRY_DELAY = datetime.timedelta(minutes=1)
+LEASE_TIME = datetime.timedelta(minutes=10)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        alternatives=[
+            (content, mimetype) for content, mimetype in email.alternatives
+        ],
+        connection=connection,
+    )
+    message.content_subtype = email.content_subtype
+    for attachment in email.attachments:
+        content = attachment['content']
+        if attachment['base64']:
+            content = base64.b64decode(content)
+        message.attachments.append(
+            (attachment['filename'], content, attachment['mimetype'])
+        )
+    return message
+
+
+def mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.send_after = now + RETRY_DELAY * 2 ** (email.attempts - 1)
+
+
+def claim_batch(batch_size, now):
+    """Пачка писем к отправке, взятая в аренду до now + LEASE_TIME."""
+    skip_locked = db_connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(
+                skip_locked=skip_locked
+            ).filter(
+                status=OutgoingEmail.PENDING, send_after__lte=now
+            )[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + LEASE_TIME)
+    return emails
+
+
+def deliver_batch(batch_size=None):
+    """Отправка одной пачки писем, возвращает (отправлено, ошибок)."""
+    now = timezone.now()
+    emails = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE, now)
+    if not emails:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection(settings.OUTBOX_DELIVERY_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error, now)
+        failed = len(emails)
+    else:
+        with connection:
+            for email in emails:
+                try:
+                    build_message(email, connection).send()
+                except Exception as error:
+                    mark_failed(email, error, now)
+                    failed += 1
+                else:
+                    email.status = OutgoingEmail.SENT
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    sent += 1
+    OutgoingEmail.objects.bulk_update(
+        emails, ['status', 'attempts', 'last_error', 'send_after', 'sent_at']
+    )
+    return sent, failed
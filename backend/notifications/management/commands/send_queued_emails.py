@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+import time
+
+from notifications.delivery import deliver_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Отправка писем из очереди OutgoingEmail. С --loop работает "
+        "как фоновый обработчик и проверяет очередь каждые --interval "
+        "секунд."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument("--interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            # Разорванное или устаревшее соединение с БД переоткрывается
+            close_old_connections()
+            sent, failed = deliver_batch(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Отправлено: {sent}, ошибок: {failed}")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
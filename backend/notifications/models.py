@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку фоновым обработчиком."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не удалось отправить'),
+    )
+
+    subject = models.CharField(
+        max_length=settings.TEXT_MAX_LENGTH,
+        blank=True,
+        verbose_name='Тема',
+    )
+    body = models.TextField(
+        blank=True,
+        verbose_name='Текст письма',
+    )
+    content_subtype = models.CharField(
+        max_length=30,
+        default='plain',
+        verbose_name='Подтип текста письма',
+    )
+    alternatives = models.JSONField(
+        default=list,
+        verbose_name='Альтернативные версии',
+        help_text='Пары [содержимое, MIME-тип], например HTML-версия',
+    )
+    attachments = models.JSONField(
+        default=list,
+        verbose_name='Вложения',
+        help_text='Имя файла, содержимое (двоичное - в base64) и MIME-тип',
+    )
+    from_email = models.CharField(
+        max_length=settings.TEXT_MAX_LENGTH,
+        blank=True,
+        null=True,
+        verbose_name='Отправитель',
+    )
+    to = models.JSONField(
+        default=list,
+        verbose_name='Получатели',
+    )
+    cc = models.JSONField(
+        default=list,
+        verbose_name='Копия',
+    )
+    bcc = models.JSONField(
+        default=list,
+        verbose_name='Скрытая копия',
+    )
+    reply_to = models.JSONField(
+        default=list,
+        verbose_name='Адрес для ответа',
+    )
+    headers = models.JSONField(
+        default=dict,
+        verbose_name='Дополнительные заголовки',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Количество попыток отправки',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Отправить не раньше',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата отправки',
+    )
+
+    class Meta:
+        ordering = ['send_after', 'id']
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='notifications_outbox_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework.throttling import BaseThrottle
+
+import json
+
+from api import async_views
+from api.permissions import SpecialistOrAdmin
+from api.views import ClientsViewSet
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest import mock
+from users.models import SpecialistClient
+from workouts.models import TrainingPlan
+
+User = get_user_model()
+
+
+class RejectThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+    def wait(self):
+        return 30
+
+
+class AsyncReadViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(
+            email="client@test.com", is_specialist=False
+        )
+        cls.link = SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+        TrainingPlan.objects.create(
+            specialist=cls.specialist, user=cls.client_user, name="plan"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, view, user, url, **kwargs):
+        headers = {}
+        if user is not None:
+            headers["Authorization"] = f"JWT {AccessToken.for_user(user)}"
+        request = AsyncRequestFactory().get(url, headers=headers)
+        return view(request, **kwargs)
+
+    async def test_workout_programs(self):
+        response = await self.get(
+            async_views.workout_programs,
+            self.client_user,
+            "/api/users/get_workout_programs/",
+        )
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual([plan["name"] for plan in results], ["plan"])
+
+    async def test_anonymous_request_is_rejected(self):
+        response = await self.get(
+            async_views.diet_programs, None, "/api/users/get_diet_programs/"
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_clients_list_and_detail(self):
+        response = await self.get(
+            async_views.clients_list, self.specialist, "/api/clients/"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(len(data["results"]), 1)
+        self.assertIsNone(data["next"])
+        response = await self.get(
+            async_views.client_detail,
+            self.specialist,
+            f"/api/clients/{self.link.pk}/",
+            pk=self.link.pk,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data["trainings"][0]["name"], "plan")
+
+    async def test_missing_client_is_json_404(self):
+        response = await self.get(
+            async_views.client_detail,
+            self.specialist,
+            "/api/clients/0/",
+            pk=0,
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(response.content)["errors"][0]["code"], "not_found"
+        )
+
+    async def test_view_throttles_and_permissions_are_checked(self):
+        url = f"/api/clients/{self.link.pk}/"
+        with mock.patch.object(
+            ClientsViewSet, "throttle_classes", [RejectThrottle]
+        ):
+            response = await self.get(
+                async_views.client_detail, self.specialist, url,
+                pk=self.link.pk,
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        with mock.patch.object(
+            SpecialistOrAdmin, "has_object_permission", return_value=False
+        ):
+            response = await self.get(
+                async_views.client_detail, self.specialist, url,
+                pk=self.link.pk,
+            )
+        self.assertEqual(response.status_code, 403)
+        response = await self.get(
+            async_views.workout_programs,
+            self.specialist,
+            "/api/users/get_workout_programs/",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    async def test_other_methods_use_sync_viewset(self):
+        token = AccessToken.for_user(self.specialist)
+        request = AsyncRequestFactory().delete(
+            f"/api/clients/{self.link.pk}/",
+            headers={"Authorization": f"JWT {token}"},
+        )
+        response = await async_views.client_detail(request, pk=self.link.pk)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(
+            await SpecialistClient.objects.filter(pk=self.link.pk).aexists()
+        )
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from users.models import Params
+from workouts.models import TrainingPlan
+
+User = get_user_model()
+
+
+class ClaimsAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="client@test.com",
+            password="testpassword",
+            first_name="Имя",
+            is_specialist=False,
+        )
+        specialist = User.objects.create_user(
+            email="specialist@test.com",
+            password="testpassword",
+            is_specialist=True,
+        )
+        TrainingPlan.objects.create(
+            specialist=specialist, user=cls.user, name="plan"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self):
+        response = self.client.post(
+            "/api/auth/jwt/create/",
+            {"email": "client@test.com", "password": "testpassword"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def get(self, url, access):
+        return self.client.get(url, HTTP_AUTHORIZATION=f"JWT {access}")
+
+    def test_tokens_carry_claims(self):
+        tokens = self.login()
+        access = AccessToken(tokens["access"])
+        self.assertEqual(access["token_version"], 0)
+        self.assertFalse(access["is_specialist"])
+        response = self.client.post(
+            "/api/auth/jwt/refresh/", {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("is_active", AccessToken(response.data["access"]))
+
+    def test_authenticated_request_skips_user_query(self):
+        access = self.login()["access"]
+        url = "/api/users/get_workout_programs/"
+        self.assertEqual(self.get(url, access).status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.get(url, access)
+        self.assertEqual(response.data["results"][0]["name"], "plan")
+
+    def test_deferred_fields_are_loaded_together(self):
+        access = self.login()["access"]
+        self.get("/api/users/get_workout_programs/", access)
+        with self.assertNumQueries(1):
+            response = self.get("/api/users/me/", access)
+        self.assertEqual(response.data["email"], "client@test.com")
+
+    def test_role_change_revokes_tokens(self):
+        tokens = self.login()
+        self.assertEqual(
+            self.get("/api/users/me/", tokens["access"]).status_code, 200
+        )
+        user = User.objects.get(pk=self.user.pk)
+        user.is_specialist = True
+        user.save()
+        self.assertEqual(
+            self.get("/api/users/me/", tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        response = self.client.post(
+            "/api/auth/jwt/refresh/", {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(AccessToken(self.login()["access"])["is_specialist"])
+
+    def test_save_bumps_token_version_only_on_claim_change(self):
+        Params.objects.create(user=self.user, weight=70)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Новое имя"
+        user.current_params = None
+        user.save()
+        user = User.objects.only("id").get(pk=self.user.pk)
+        self.assertEqual(user.first_name, "Новое имя")
+        self.assertIsNone(user.current_params)
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+        user.save()
+        user.refresh_from_db()
+        self.assertTrue(user.is_staff)
+        self.assertEqual(user.token_version, 1)
+
+    def test_deactivation_revokes_tokens(self):
+        access = self.login()["access"]
+        response = self.client.delete(
+            f"/api/users/{self.user.pk}/",
+            {"email": "client@test.com", "current_password": "testpassword"},
+            HTTP_AUTHORIZATION=f"JWT {access}",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.first_name, "Имя")
+        self.assertEqual(
+            self.get("/api/users/me/", access).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_tokens_without_claims_are_still_accepted(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.get("/api/users/me/", access).status_code, 200)
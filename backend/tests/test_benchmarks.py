@@ -0,0 +1,50 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+import io
+import json
+import os
+import tempfile
+
+SMALL = ["--specialists", "1", "--clients", "2", "--plans", "1",
+         "--params", "3", "--repeat", "1"]
+
+
+class BenchApiTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baseline = os.path.join(directory.name, "baseline.json")
+
+    def bench(self, *args):
+        out = io.StringIO()
+        call_command(
+            "bench_api", *SMALL, "--baseline", self.baseline, *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_all_cases_run_and_baseline_is_stored(self):
+        output = self.bench("--update-baseline")
+        for name in ("training-plans list", "clients create",
+                     "TrainingPlanSerializer"):
+            self.assertIn(name, output)
+        with open(self.baseline) as file:
+            results = json.load(file)[connection.vendor]
+        self.assertEqual(results["users get_workout_programs"]["queries"], 1)
+
+    def test_extra_queries_are_reported_as_regression(self):
+        self.bench("--update-baseline", "--case", "clients list")
+        with open(self.baseline) as file:
+            baselines = json.load(file)
+        baselines[connection.vendor]["clients list"]["queries"] = 0
+        with open(self.baseline, "w") as file:
+            json.dump(baselines, file)
+        with self.assertRaisesMessage(CommandError, "clients list"):
+            self.bench("--case", "clients list")
+
+    def test_missing_baseline_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "clients list"):
+            self.bench("--case", "clients list")
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import io
+
+from api.views import ExerciseViewSet
+from workouts.catalog import parse_muscles
+from workouts.models import (Exercise, ExerciseMuscleGroup, MuscleGroup,
+                             TrainingType,)
+
+User = get_user_model()
+
+
+class ExerciseCatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.strength = TrainingType.objects.create(name="Силовая")
+        Exercise.objects.create(
+            name="Жим лежа",
+            target_muscles="Грудь, трицепс",
+            auxiliary_muscles="Дельты",
+            training_type=cls.strength,
+        )
+        Exercise.objects.create(
+            name="Отжимания на брусьях",
+            target_muscles="Трицепс",
+            auxiliary_muscles="грудь;  дельты",
+        )
+        Exercise.objects.create(name="Приседания", target_muscles="Ноги")
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_names(self, params):
+        request = self.factory.get("/api/exercises/", params)
+        force_authenticate(request, user=self.user)
+        response = ExerciseViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return [exercise["name"] for exercise in response.data["results"]]
+
+    def test_muscles_are_normalized(self):
+        self.assertEqual(
+            parse_muscles(" Грудь,грудь; Передние  дельты\n"),
+            ["грудь", "передние дельты"],
+        )
+        self.assertEqual(
+            set(MuscleGroup.objects.values_list("name", flat=True)),
+            {"грудь", "трицепс", "дельты", "ноги"},
+        )
+
+    def test_filters(self):
+        self.assertEqual(
+            self.get_names({"muscle": "Грудь"}),
+            ["Жим лежа", "Отжимания на брусьях"],
+        )
+        self.assertEqual(
+            self.get_names({"muscle": "грудь", "role": "target"}),
+            ["Жим лежа"],
+        )
+        self.assertEqual(
+            self.get_names({"muscle": "трицепс,дельты", "search": "отж"}),
+            ["Отжимания на брусьях"],
+        )
+        self.assertEqual(
+            self.get_names({"type": self.strength.pk}), ["Жим лежа"]
+        )
+
+    def test_catalog_is_cached_until_exercises_change(self):
+        self.get_names({})
+        with self.assertNumQueries(0):
+            self.get_names({"muscle": "ноги"})
+        exercise = Exercise.objects.get(name="Приседания")
+        exercise.target_muscles = "Ягодицы"
+        exercise.save()
+        self.assertEqual(self.get_names({"muscle": "ноги"}), [])
+        self.assertEqual(
+            self.get_names({"muscle": "ягодицы"}), ["Приседания"]
+        )
+
+    def test_unused_muscle_groups_are_deleted(self):
+        exercise = Exercise.objects.get(name="Приседания")
+        exercise.target_muscles = "Ягодицы"
+        exercise.save()
+        self.assertFalse(MuscleGroup.objects.filter(name="ноги").exists())
+        exercise.delete()
+        self.assertFalse(
+            MuscleGroup.objects.filter(name="ягодицы").exists()
+        )
+
+    def test_sync_command_backfills_links(self):
+        ExerciseMuscleGroup.objects.all().delete()
+        MuscleGroup.objects.create(name="спина")
+        self.assertEqual(self.get_names({"muscle": "грудь"}), [])
+        call_command("sync_muscle_groups", stdout=io.StringIO())
+        self.assertEqual(
+            self.get_names({"muscle": "грудь", "role": "target"}),
+            ["Жим лежа"],
+        )
+        self.assertEqual(
+            set(MuscleGroup.objects.values_list("name", flat=True)),
+            {"грудь", "трицепс", "дельты", "ноги"},
+        )
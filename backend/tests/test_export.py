@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import csv
+import io
+import json
+
+from api import export
+from api.views import ClientsViewSet
+from users.models import Params, SpecialistClient
+from workouts.models import Training, TrainingPlan, TrainingPlanTraining
+
+User = get_user_model()
+
+
+class ClientExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        for number in range(5):
+            client = User.objects.create_user(
+                email=f"client{number}@test.com", first_name=f"name{number}"
+            )
+            SpecialistClient.objects.create(
+                specialist=cls.specialist, user=client, notes="заметка"
+            )
+            Params.objects.create(weight=80, height=180, user=client)
+            Params.objects.create(weight=79, height=180, user=client)
+            plan = TrainingPlan.objects.create(
+                specialist=cls.specialist, user=client, name="plan"
+            )
+            TrainingPlanTraining.objects.create(
+                training=Training.objects.create(weekday="1"),
+                training_plan=plan,
+            )
+
+    def export(self, output):
+        request = APIRequestFactory().get(
+            "/api/clients/export/", {"output": output}
+        )
+        force_authenticate(request, user=self.specialist)
+        response = ClientsViewSet.as_view({"get": "export"})(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_queries_per_chunk(self):
+        self.addCleanup(setattr, export, "EXPORT_CHUNK_SIZE",
+                        export.EXPORT_CHUNK_SIZE)
+        export.EXPORT_CHUNK_SIZE = 2
+        # Клиенты одним курсором и по 4 предзагрузки на каждую из 3 пачек
+        with self.assertNumQueries(1 + 3 * 4):
+            content = self.export("ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            [row["user"]["first_name"] for row in rows],
+            [f"name{number}" for number in range(5)],
+        )
+        self.assertEqual([p["weight"] for p in rows[0]["params"]], [79, 80])
+        self.assertEqual(rows[0]["user"]["params"]["weight"], 79)
+        self.assertEqual(len(rows[0]["trainings"][0]["training"]), 1)
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("csv"))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["user_email"], "client0@test.com")
+        self.assertEqual(rows[0]["notes"], "заметка")
+        self.assertEqual(len(json.loads(rows[0]["params"])), 2)
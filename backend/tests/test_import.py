@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import ClientsViewSet
+from users.models import Params, SpecialistClient
+
+User = get_user_model()
+
+
+class ClientImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        User.objects.create_user(email="taken@test.com")
+
+    def post(self, data, format="json"):
+        request = APIRequestFactory().post(
+            "/api/clients/import/", data, format=format
+        )
+        force_authenticate(request, user=self.specialist)
+        return ClientsViewSet.as_view({"post": "import_clients"})(request)
+
+    def test_json_import_in_bulk(self):
+        rows = [
+            {"email": f"client{number}@test.com", "first_name": "Имя",
+             "weight": 70 + number, "notes": "из зала"}
+            for number in range(30)
+        ]
+        rows.append({"email": "noparams@test.com"})
+        with self.assertNumQueries(7):
+            response = self.post(rows)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"created": 31})
+        self.assertEqual(
+            SpecialistClient.objects.filter(
+                specialist=self.specialist
+            ).count(),
+            31,
+        )
+        self.assertEqual(Params.objects.count(), 30)
+        client = User.objects.get(email="client5@test.com")
+        self.assertFalse(client.is_specialist)
+        self.assertEqual(client.params.get().weight, 75)
+        self.assertEqual(client.current_params.weight, 75)
+
+    def test_errors_are_reported_per_row_and_nothing_is_saved(self):
+        response = self.post([
+            {"email": "new@test.com"},
+            {"email": "taken@test.com"},
+            {"email": "new@test.com"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [2, 3]
+        )
+        response = self.post([{"email": "ok@test.com"}, {"weight": "x"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.data["errors"][0]["errors"]), {"email", "weight"}
+        )
+        self.assertFalse(User.objects.filter(email="new@test.com").exists())
+        self.assertFalse(User.objects.filter(email="ok@test.com").exists())
+
+    def test_csv_import(self):
+        content = (
+            "email,first_name,dob,weight,height\n"
+            "csv1@test.com,Анна,1990-05-01,60,170\n"
+            "csv2@test.com,,,,\n"
+        ).encode()
+        response = self.post(
+            {"file": SimpleUploadedFile("clients.csv", content)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            User.objects.get(email="csv1@test.com").first_name, "Анна"
+        )
+        self.assertIsNone(User.objects.get(email="csv2@test.com").first_name)
+        self.assertEqual(Params.objects.count(), 1)
+
+    def test_standard_password_follows_settings(self):
+        for password in ("first-password", "second-password"):
+            with override_settings(STD_CLIENT_PASSWORD=password):
+                response = self.post([{"email": f"{password}@test.com"}])
+            self.assertEqual(response.status_code, 201)
+            client = User.objects.get(email=f"{password}@test.com")
+            self.assertTrue(client.check_password(password))
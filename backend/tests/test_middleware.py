@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, RequestFactory, TestCase
+
+from api.middleware import is_stateless_request
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+class StatelessMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True,
+            is_superuser=True,
+        )
+
+    def test_api_requests_skip_session_and_csrf(self):
+        client = Client(
+            HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(self.user)}"
+        )
+        response = client.get("/api/users/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        self.assertFalse(response.cookies)
+
+    def test_api_ignores_session_login(self):
+        client = Client()
+        client.force_login(self.user)
+        self.assertEqual(client.get("/api/users/me/").status_code, 401)
+
+    def test_admin_keeps_session(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get("/admin/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_social_auth_keeps_session(self):
+        factory = RequestFactory()
+        self.assertTrue(is_stateless_request(factory.get("/api/clients/")))
+        self.assertFalse(is_stateless_request(
+            factory.get("/api/auth/o/vk-oauth2/")
+        ))
+        self.assertFalse(is_stateless_request(factory.get("/admin/")))
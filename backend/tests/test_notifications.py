@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives, send_mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import datetime
+
+from api.views import DietPlanViewSet
+from email.mime.text import MIMEText
+from unittest import mock
+from users.models import SpecialistClient
+
+from diets.models import DietPlan
+from notifications.delivery import deliver_batch
+from notifications.models import OutgoingEmail
+
+User = get_user_model()
+
+
+@override_settings(
+    EMAIL_BACKEND="notifications.backends.OutboxEmailBackend",
+    OUTBOX_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+class OutboxTests(TestCase):
+    def test_emails_are_queued_and_sent_by_worker(self):
+        send_mail("Тема", "Текст", "from@test.com", ["to@test.com"])
+        self.assertEqual(mail.outbox, [])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, ["to@test.com"])
+        call_command("send_queued_emails", stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Тема")
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.SENT)
+
+    def test_failed_emails_are_retried_then_marked_failed(self):
+        send_mail("Тема", "Текст", "from@test.com", ["to@test.com"])
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("smtp down"),
+        ):
+            self.assertEqual(deliver_batch(), (0, 1))
+            self.assertEqual(deliver_batch(), (0, 0))
+            email = OutgoingEmail.objects.get()
+            self.assertEqual(email.status, OutgoingEmail.PENDING)
+            self.assertGreater(email.send_after, timezone.now())
+            email.send_after -= datetime.timedelta(hours=1)
+            email.save()
+            self.assertEqual(deliver_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertIn("smtp down", email.last_error)
+
+    def test_batch_is_leased_while_sending(self):
+        send_mail("Тема", "Текст", "from@test.com", ["to@test.com"])
+
+        def send_messages(messages):
+            self.assertEqual(deliver_batch(), (0, 0))
+            return len(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=send_messages,
+        ):
+            self.assertEqual(deliver_batch(), (1, 0))
+        self.assertEqual(OutgoingEmail.objects.get().status,
+                         OutgoingEmail.SENT)
+
+    def test_loop_refreshes_db_connections(self):
+        module = "notifications.management.commands.send_queued_emails"
+        sleep = mock.patch(
+            f"{module}.time.sleep", side_effect=[None, KeyboardInterrupt]
+        )
+        with mock.patch(f"{module}.close_old_connections") as close, sleep:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    "send_queued_emails", "--loop", stdout=mock.MagicMock()
+                )
+        self.assertEqual(close.call_count, 2)
+
+    def send_queued(self):
+        call_command("send_queued_emails", stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 1)
+        return mail.outbox[0]
+
+    def test_attachments_are_queued(self):
+        message = EmailMessage("Тема", "Текст", to=["to@test.com"])
+        message.attach("plan.pdf", b"%PDF\x00\xff", "application/pdf")
+        message.attach("plan.txt", "План", "text/plain")
+        message.send()
+        sent = self.send_queued()
+        self.assertEqual(sent.attachments, [
+            ("plan.pdf", b"%PDF\x00\xff", "application/pdf"),
+            ("plan.txt", "План", "text/plain"),
+        ])
+        self.assertIn(b"JVBERgD/", sent.message().as_bytes())
+
+    def test_alternatives_are_queued(self):
+        message = EmailMultiAlternatives("Тема", "Текст", to=["to@test.com"])
+        message.attach_alternative("<p>Текст</p>", "text/html")
+        message.attach_alternative("BEGIN:VCALENDAR", "text/calendar")
+        message.send()
+        self.assertEqual(self.send_queued().alternatives, [
+            ("<p>Текст</p>", "text/html"),
+            ("BEGIN:VCALENDAR", "text/calendar"),
+        ])
+
+    def test_content_subtype_is_queued(self):
+        message = EmailMessage("Тема", "<p>Текст</p>", to=["to@test.com"])
+        message.content_subtype = "html"
+        message.send()
+        sent = self.send_queued()
+        self.assertEqual(sent.content_subtype, "html")
+        self.assertEqual(sent.message().get_content_type(), "text/html")
+
+    def test_mime_attachments_are_sent_directly(self):
+        message = EmailMessage("Тема", "Текст", to=["to@test.com"])
+        message.attach(MIMEText("Вложение"))
+        self.assertEqual(message.send(), 1)
+        self.assertFalse(OutgoingEmail.objects.exists())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_send_link_queues_email_to_client(self):
+        specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        client = User.objects.create_user(email="client@test.com")
+        SpecialistClient.objects.create(specialist=specialist, user=client)
+        plan = DietPlan.objects.create(
+            specialist=specialist, user=client, name="Сушка"
+        )
+        request = APIRequestFactory().post(
+            f"/api/diet-plans/{plan.pk}/send_link/", {"user": client.pk}
+        )
+        force_authenticate(request, user=specialist)
+        response = DietPlanViewSet.as_view({"post": "send_link"})(
+            request, pk=plan.pk
+        )
+        self.assertEqual(response.status_code, 200)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, ["client@test.com"])
+        self.assertIn(response.data["link"], email.body)
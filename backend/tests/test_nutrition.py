@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from diets.models import (DietPlan, DietPlanDiet, Diets, DietsMealsList,
+                          MealProduct, Meals, MealsList, Products,)
+
+User = get_user_model()
+
+
+class NutritionTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        specialist = User.objects.create_user(email="specialist@test.com")
+        client = User.objects.create_user(email="client@test.com")
+        cls.plan = DietPlan.objects.create(specialist=specialist, user=client)
+        cls.product = Products.objects.create(
+            name="rice", kkal=130, protein=3, carbo=28, fat=0, describe=""
+        )
+        cls.meal = Meals.objects.create(
+            name="rice bowl", describe="", recipe="", link=""
+        )
+        cls.meal_product = MealProduct.objects.create(
+            meal=cls.meal, product=cls.product, quantity=150
+        )
+        cls.monday = Diets.objects.create(weekday="1")
+        cls.tuesday = Diets.objects.create(weekday="2")
+        for diet in (cls.monday, cls.tuesday):
+            DietsMealsList.objects.create(
+                diet=diet, meals_list=MealsList.objects.create(meal=cls.meal)
+            )
+            DietPlanDiet.objects.create(diet=diet, diet_plan=cls.plan)
+
+    def refresh(self):
+        for obj in (self.meal, self.monday, self.plan):
+            obj.refresh_from_db()
+
+    def test_totals_are_calculated_through_the_graph(self):
+        self.refresh()
+        self.assertEqual(self.meal.kkal_total, 195)
+        self.assertEqual(self.monday.carbo_total, 42)
+        self.assertEqual(self.plan.kkal_total, 390)
+
+    def test_product_change_updates_dependent_totals(self):
+        self.product.kkal = 100
+        self.product.save()
+        self.refresh()
+        self.assertEqual(self.meal.kkal_total, 150)
+        self.assertEqual(self.plan.kkal_total, 300)
+
+    def test_removed_day_is_excluded_from_plan(self):
+        self.tuesday.delete()
+        self.meal_product.quantity = 100
+        self.meal_product.save()
+        self.refresh()
+        self.assertEqual(self.monday.kkal_total, 130)
+        self.assertEqual(self.plan.kkal_total, 130)
@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import datetime
+
+from api.views import ParamsViewSet
+from users.models import Params, SpecialistClient
+from users.params import downsample
+
+User = get_user_model()
+
+
+class CurrentParamsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="client@test.com")
+
+    def test_pointer_follows_latest_params(self):
+        first = Params.objects.create(user=self.user, weight=80)
+        second = Params.objects.create(user=self.user, weight=78)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_params, second)
+        second.delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_params, first)
+        first.delete()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.current_params)
+
+    def test_full_save_after_adding_params_keeps_pointer(self):
+        user = User.objects.get(pk=self.user.pk)
+        params = user.params.create(weight=80)
+        user.first_name = "Имя"
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.current_params, params)
+
+    def test_full_save_of_deferred_user_keeps_pointer(self):
+        user = User.objects.only("id", "first_name").get(pk=self.user.pk)
+        params = Params.objects.create(user=self.user, weight=80)
+        user.first_name = "Имя"
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.current_params, params)
+
+
+class ParamsHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(email="client@test.com")
+        cls.stranger = User.objects.create_user(email="stranger@test.com")
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+        for weight in range(70, 75):
+            Params.objects.create(user=cls.client_user, weight=weight)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_history(self, user, url):
+        request = self.factory.get(url)
+        force_authenticate(request, user=user)
+        return ParamsViewSet.as_view({"get": "list"})(request)
+
+    def test_own_history_pages(self):
+        response = self.get_history(
+            self.client_user, "/api/params/?page_size=3"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        weights = [row["weight"] for row in response.data["results"]]
+        self.assertEqual(weights, [74, 73, 72])
+        response = self.get_history(self.client_user, response.data["next"])
+        weights = [row["weight"] for row in response.data["results"]]
+        self.assertEqual(weights, [71, 70])
+        self.assertIsNone(response.data["next"])
+
+    def test_history_of_client_for_specialist_only(self):
+        url = f"/api/params/?user={self.client_user.id}"
+        response = self.get_history(self.specialist, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        response = self.get_history(self.stranger, url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ParamsSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_user = User.objects.create_user(email="client@test.com")
+        cls.stranger = User.objects.create_user(email="stranger@test.com")
+        start = timezone.make_aware(datetime.datetime(2024, 1, 1, 9))
+        for hours, weight in ((0, 80), (3, 82), (24, 79), (48, None)):
+            params = Params.objects.create(
+                user=cls.client_user, weight=weight, height=180
+            )
+            Params.objects.filter(pk=params.pk).update(
+                created_at=start + datetime.timedelta(hours=hours)
+            )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_series(self, user, query):
+        request = self.factory.get("/api/params/series/", query)
+        force_authenticate(request, user=user)
+        return ParamsViewSet.as_view({"get": "series"})(request)
+
+    def test_daily_buckets_are_aggregated(self):
+        with self.assertNumQueries(1):
+            response = self.get_series(self.client_user, {"period": "day"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(point["avg"], point["min"], point["max"], point["count"])
+             for point in response.data],
+            [(81, 80, 82, 2), (79, 79, 79, 1)],
+        )
+        response = self.get_series(
+            self.client_user, {"metric": "height", "period": "month"}
+        )
+        self.assertEqual(response.data[0]["count"], 4)
+
+    def test_invalid_query_and_foreign_user(self):
+        response = self.get_series(self.client_user, {"period": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.get_series(
+            self.stranger, {"user": str(self.client_user.id)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_downsample_keeps_edges_and_peaks(self):
+        start = timezone.now()
+        points = [
+            {"bucket": start + datetime.timedelta(days=day),
+             "avg": 100 if day == 50 else 70}
+            for day in range(365)
+        ]
+        sampled = downsample(points, 20)
+        self.assertEqual(len(sampled), 20)
+        self.assertIs(sampled[0], points[0])
+        self.assertIs(sampled[-1], points[-1])
+        self.assertIn(points[50], sampled)
+        short = points[:10]
+        self.assertIs(downsample(short, 20), short)
@@ -0,0 +1,523 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import (APIClient, APIRequestFactory,
+                                 force_authenticate,)
+
+import base64
+import datetime
+import json
+
+from api.views import ClientsViewSet, CustomUserViewSet, TrainingPlanViewSet
+from users.models import Params, SpecialistClient, Specialists
+from workouts.models import Training, TrainingPlan, TrainingPlanTraining
+
+from diets.models import DietPlan, DietPlanDiet, Diets
+
+User = get_user_model()
+
+
+class ClientProfileQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com",
+            password="testpassword",
+            is_specialist=True,
+        )
+        cls.client_user = User.objects.create_user(
+            email="client@test.com",
+            password="testpassword",
+            is_specialist=False,
+        )
+        cls.client_obj = SpecialistClient.objects.create(
+            specialist=cls.specialist,
+            user=cls.client_user,
+        )
+        Params.objects.create(weight=80, height=180, user=cls.client_user)
+        Params.objects.create(weight=78, height=180, user=cls.client_user)
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def add_plans(self, count):
+        for number in range(count):
+            training_plan = TrainingPlan.objects.create(
+                specialist=self.specialist,
+                user=self.client_user,
+                name=f"training plan {number}",
+            )
+            diet_plan = DietPlan.objects.create(
+                specialist=self.specialist,
+                user=self.client_user,
+                name=f"diet plan {number}",
+            )
+            for weekday in ("1", "2"):
+                TrainingPlanTraining.objects.create(
+                    training=Training.objects.create(weekday=weekday),
+                    training_plan=training_plan,
+                )
+                DietPlanDiet.objects.create(
+                    diet=Diets.objects.create(weekday=weekday),
+                    diet_plan=diet_plan,
+                )
+
+    def retrieve(self):
+        request = self.factory.get(f"/api/clients/{self.client_obj.id}/")
+        force_authenticate(request, user=self.specialist)
+        view = ClientsViewSet.as_view({"get": "retrieve"})
+        response = view(request, pk=self.client_obj.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_retrieve_query_count_does_not_depend_on_plans(self):
+        self.add_plans(1)
+        with self.assertNumQueries(5):
+            self.retrieve()
+        self.add_plans(30)
+        with self.assertNumQueries(5):
+            response = self.retrieve()
+        self.assertEqual(len(response.data["trainings"]), 31)
+        self.assertEqual(len(response.data["diets"]), 31)
+        self.assertEqual(len(response.data["trainings"][0]["training"]), 2)
+        self.assertEqual(response.data["user"]["params"]["weight"], 78)
+
+
+class ClientListQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com",
+            password="testpassword",
+            is_specialist=True,
+        )
+        today = datetime.date.today()
+        for number in range(5):
+            client = User.objects.create_user(
+                email=f"client{number}@test.com",
+                first_name=f"name{number}",
+                dob=today.replace(year=today.year - 30),
+                is_specialist=False,
+            )
+            SpecialistClient.objects.create(
+                specialist=cls.specialist, user=client
+            )
+        SpecialistClient.objects.create(
+            specialist=cls.specialist,
+            user=User.objects.create_user(email="nodob@test.com"),
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_list(self, url):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.specialist)
+        view = ClientsViewSet.as_view({"get": "list"})
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_list_is_single_query_with_age(self):
+        with self.assertNumQueries(1):
+            response = self.get_list("/api/clients/")
+        results = response.data["results"]
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0]["age"], "Возраст не указан")
+        self.assertEqual(
+            {client["age"] for client in results[1:]}, {30}
+        )
+
+    def test_list_cursor_pages(self):
+        response = self.get_list("/api/clients/?page_size=4")
+        first_page = response.data["results"]
+        self.assertEqual(len(first_page), 4)
+        self.assertIsNone(response.data["previous"])
+        response = self.get_list(response.data["next"])
+        second_page = response.data["results"]
+        self.assertEqual(len(second_page), 2)
+        self.assertIsNone(response.data["next"])
+        ids = [client["id"] for client in first_page + second_page]
+        self.assertEqual(len(set(ids)), 6)
+        response = self.get_list(response.data["previous"])
+        self.assertEqual(response.data["results"], first_page)
+
+
+class UserListQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(6):
+            user = User.objects.create_user(
+                email=f"specialist{number}@test.com", is_specialist=True
+            )
+            Params.objects.create(user=user, weight=70 + number)
+            Specialists.objects.create(
+                user=user, experience="5 лет", contacts="", about=""
+            )
+        cls.user = user
+
+    def get_list(self, page_size):
+        request = APIRequestFactory().get(f"/api/users/?page_size={page_size}")
+        force_authenticate(request, user=self.user)
+        response = CustomUserViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for page_size in (2, 6):
+            with self.assertNumQueries(2):
+                users = self.get_list(page_size)
+            self.assertEqual(len(users), page_size)
+            self.assertEqual(users[0]["specialist"][0]["experience"], "5 лет")
+            self.assertEqual(len(users[0]["params"]), 1)
+
+
+class PlanListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(email="client@test.com")
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+        for number in range(5):
+            TrainingPlan.objects.create(
+                specialist=cls.specialist,
+                user=cls.client_user,
+                name=f"plan {number}",
+            )
+        # Одинаковое время создания, порядок страниц решает id
+        TrainingPlan.objects.update(create_dt=timezone.now())
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def collect_pages(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        names = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            names += [plan["name"] for plan in response.data["results"]]
+            url = response.data["next"]
+        return names
+
+    def test_plan_list_pages(self):
+        names = self.collect_pages(
+            self.specialist,
+            f"/api/training-plans/?user={self.client_user.id}&page_size=2",
+        )
+        self.assertEqual(sorted(names), [f"plan {n}" for n in range(5)])
+
+    def test_client_programs_pages(self):
+        names = self.collect_pages(
+            self.client_user, "/api/users/get_workout_programs/?page_size=2"
+        )
+        self.assertEqual(sorted(names), [f"plan {n}" for n in range(5)])
+
+    def test_tampered_cursor_is_not_found(self):
+        client = APIClient()
+        client.force_authenticate(user=self.specialist)
+        now = timezone.now().isoformat()
+        for position in (["not-a-date", 1], [now, "abc"], [now, None],
+                         [now, 10 ** 30], [[], 1]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"p": position}).encode()
+            ).decode()
+            response = client.get(
+                f"/api/training-plans/?user={self.client_user.id}"
+                f"&cursor={cursor}"
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_404_NOT_FOUND, position
+            )
+
+
+class PlanSparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(email="client@test.com")
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+        for number in range(3):
+            plan = TrainingPlan.objects.create(
+                specialist=cls.specialist,
+                user=cls.client_user,
+                name=f"plan {number}",
+                describe="long description",
+            )
+            TrainingPlanTraining.objects.create(
+                training=Training.objects.create(weekday="1"),
+                training_plan=plan,
+            )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_plans(self, query=""):
+        request = self.factory.get(
+            f"/api/training-plans/?user={self.client_user.id}{query}"
+        )
+        force_authenticate(request, user=self.specialist)
+        view = TrainingPlanViewSet.as_view({"get": "list"})
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"], [
+            query["sql"] for query in queries.captured_queries
+        ]
+
+    def test_fields_prune_columns_and_prefetch(self):
+        plans, queries = self.get_plans("&fields=id,name,create_dt")
+        self.assertEqual(set(plans[0]), {"id", "name", "create_dt"})
+        self.assertFalse(any("describe" in sql for sql in queries))
+        self.assertFalse(any("_prefetch_related_val" in sql
+                             for sql in queries))
+
+    def test_unknown_fields_are_rejected(self):
+        request = self.factory.get(
+            f"/api/training-plans/?user={self.client_user.id}"
+            "&fields=id,nmae,price"
+        )
+        force_authenticate(request, user=self.specialist)
+        response = TrainingPlanViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [(error["attr"], error["detail"])
+             for error in response.data["errors"]],
+            [("fields", "Неизвестное поле: nmae"),
+             ("fields", "Неизвестное поле: price")],
+        )
+
+    def test_nested_days_are_prefetched_by_default(self):
+        plans, queries = self.get_plans()
+        self.assertEqual(len(plans), 3)
+        self.assertEqual(len(plans[0]["training"]), 1)
+        self.assertEqual(
+            sum('FROM "workouts_training"' in sql for sql in queries), 1
+        )
+
+    def test_expand_related_user(self):
+        plans, queries = self.get_plans("&fields=id&expand=user")
+        self.assertEqual(set(plans[0]), {"id", "user"})
+        self.assertEqual(plans[0]["user"]["email"], "client@test.com")
+        self.assertFalse(
+            any('FROM "users_user"' in sql for sql in queries[1:])
+        )
+
+
+class PlanNestedWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com",
+            password="testpassword",
+            is_specialist=True,
+        )
+        cls.client_user = User.objects.create_user(
+            email="client@test.com", is_specialist=False
+        )
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def send(self, method, url, data, action, **kwargs):
+        request = getattr(self.factory, method)(url, data, format="json")
+        force_authenticate(request, user=self.specialist)
+        view = TrainingPlanViewSet.as_view({method: action})
+        return view(request, **kwargs)
+
+    def plan_data(self, trainings):
+        return {
+            "specialist": self.specialist.id,
+            "user": self.client_user.id,
+            "name": "week",
+            "training": [
+                {"weekday": weekday, "spec_comment": comment}
+                for weekday, comment in trainings
+            ],
+        }
+
+    def test_create_inserts_nested_rows_in_bulk(self):
+        trainings = [(str(day), "run") for day in range(1, 8)] * 3
+        with self.assertNumQueries(9):
+            response = self.send(
+                "post",
+                "/api/training-plans/",
+                self.plan_data(trainings),
+                "create",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["training"]), 21)
+        self.assertEqual(TrainingPlanTraining.objects.count(), 21)
+
+    def test_update_changes_only_modified_trainings(self):
+        response = self.send(
+            "post",
+            "/api/training-plans/",
+            self.plan_data([("1", "run"), ("2", "swim"), ("3", "rest")]),
+            "create",
+        )
+        plan_id = response.data["id"]
+        kept = set(
+            Training.objects.filter(
+                spec_comment__in=("run", "swim")
+            ).values_list("id", flat=True)
+        )
+        response = self.send(
+            "put",
+            f"/api/training-plans/{plan_id}/?user={self.client_user.id}",
+            self.plan_data([("1", "run"), ("2", "swim"), ("4", "bike")]),
+            "update",
+            pk=plan_id,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [training["spec_comment"] for training in
+             response.data["training"]],
+            ["run", "swim", "bike"],
+        )
+        self.assertEqual(Training.objects.count(), 3)
+        self.assertTrue(kept <= set(Training.objects.values_list(
+            "id", flat=True)))
+        self.assertFalse(Training.objects.filter(spec_comment="rest").exists())
+
+
+class SpecialistClientCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(
+            email="client@test.com", is_specialist=False
+        )
+        cls.new_client = User.objects.create_user(
+            email="new@test.com", is_specialist=False
+        )
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_plans(self, user):
+        request = self.factory.get(f"/api/training-plans/?user={user.id}")
+        force_authenticate(request, user=self.specialist)
+        view = TrainingPlanViewSet.as_view({"get": "list"})
+        return view(request)
+
+    def test_permission_uses_cached_client_ids(self):
+        self.assertEqual(self.get_plans(self.client_user).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                self.get_plans(self.client_user).status_code, 200
+            )
+        self.assertFalse(
+            any("users_specialistclient" in query["sql"]
+                for query in queries.captured_queries)
+        )
+
+    def test_cache_is_invalidated_on_link_changes(self):
+        self.assertEqual(self.get_plans(self.new_client).status_code, 403)
+        link = SpecialistClient.objects.create(
+            specialist=self.specialist, user=self.new_client
+        )
+        self.assertEqual(self.get_plans(self.new_client).status_code, 200)
+        link.delete()
+        self.assertEqual(self.get_plans(self.new_client).status_code, 403)
+
+
+class PlanResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialist = User.objects.create_user(
+            email="specialist@test.com", is_specialist=True
+        )
+        cls.client_user = User.objects.create_user(
+            email="client@test.com", is_specialist=False
+        )
+        SpecialistClient.objects.create(
+            specialist=cls.specialist, user=cls.client_user
+        )
+        cls.plan = TrainingPlan.objects.create(
+            specialist=cls.specialist, user=cls.client_user, name="plan"
+        )
+        cls.training = Training.objects.create(weekday="1")
+        TrainingPlanTraining.objects.create(
+            training=cls.training, training_plan=cls.plan
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def get_plans(self):
+        request = self.factory.get(
+            f"/api/training-plans/?user={self.client_user.id}"
+        )
+        force_authenticate(request, user=self.specialist)
+        view = TrainingPlanViewSet.as_view({"get": "list"})
+        return view(request)
+
+    def test_repeated_list_is_served_from_cache(self):
+        self.get_plans()
+        with self.assertNumQueries(0):
+            response = self.get_plans()
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_of_nested_days_invalidate_cache(self):
+        self.get_plans()
+        self.training.spec_comment = "updated"
+        self.training.save()
+        response = self.get_plans()
+        plan = response.data["results"][0]
+        self.assertEqual(plan["training"][0]["spec_comment"], "updated")
+
+    def test_not_modified_response_skips_serialization(self):
+        response = self.get_plans()
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+        request = self.factory.get(
+            f"/api/training-plans/?user={self.client_user.id}",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        force_authenticate(request, user=self.specialist)
+        view = TrainingPlanViewSet.as_view({"get": "list"})
+        with self.assertNumQueries(0):
+            response = view(request)
+        self.assertEqual(response.status_code, 304)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(
+            any("workouts_training\".\"spec_comment" in query["sql"]
+                for query in queries.captured_queries)
+        )
+        Training.objects.filter(pk=self.training.pk).delete()
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
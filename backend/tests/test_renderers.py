@@ -0,0 +1,145 @@
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from unittest import mock
+
+DATA = ReturnDict(
+    {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "create_dt": datetime.datetime(
+            2023, 10, 18, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        ),
+        "local_dt": timezone.make_aware(datetime.datetime(2023, 1, 1, 9)),
+        "dob": datetime.date(1990, 1, 1),
+        "time": datetime.time(7, 5, 1, 500),
+        "duration": datetime.timedelta(minutes=90),
+        "weight": decimal.Decimal("72.50"),
+        "name": gettext_lazy("Имя"),
+        "comment": "строка\u2028с разделителем",
+        "days": [{1: "пн", "ids": (1, 2)}, None, True, 1.5],
+    },
+    serializer=None,
+)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+        )
+
+    def test_scalars_against_json_renderer(self):
+        same = [
+            0.1, 1.5, -0.0, 3.0, 123456789.123, 2 ** 53,
+            decimal.Decimal("72.50"), decimal.Decimal("0.1"),
+            datetime.datetime(2023, 10, 18, 12, 30, 15, 123456),
+            datetime.datetime(
+                2023, 10, 18, tzinfo=datetime.timezone(
+                    datetime.timedelta(hours=3)
+                )
+            ),
+            datetime.date(2023, 10, 18),
+            datetime.time(7, 5, 1, 500),
+            uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        ]
+        for value in same:
+            with self.subTest(value=value):
+                self.assertEqual(
+                    FastJSONRenderer().render([value]),
+                    JSONRenderer().render([value]),
+                )
+        # Отличия, описанные в api.renderers
+        different = [
+            (1e-7, b"[1e-7]", b"[1e-07]"),
+            (1e20, b"[1e20]", b"[1e+20]"),
+            (2.5e-5, b"[0.000025]", b"[2.5e-05]"),
+            (decimal.Decimal("1E-7"), b"[1e-7]", b"[1e-07]"),
+        ]
+        for value, fast, stdlib in different:
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render([value]), fast)
+                self.assertEqual(JSONRenderer().render([value]), stdlib)
+                self.assertEqual(json.loads(fast), json.loads(stdlib))
+        for value in (float("nan"), float("inf")):
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render([value]), b"[null]")
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render([value])
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            content = FastJSONRenderer().render(DATA)
+        self.assertEqual(content, JSONRenderer().render(DATA))
+
+    def test_indented_and_unsupported_data_use_json_renderer(self):
+        context = {"indent": 4}
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, renderer_context=context),
+            JSONRenderer().render(DATA, renderer_context=context),
+        )
+        self.assertEqual(
+            FastJSONRenderer().render({"big": 2 ** 70}),
+            JSONRenderer().render({"big": 2 ** 70}),
+        )
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({"value": object()})
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, parser, content, encoding="utf-8"):
+        return parser.parse(
+            io.BytesIO(content), parser_context={"encoding": encoding}
+        )
+
+    def test_result_matches_json_parser(self):
+        content = JSONRenderer().render(DATA)
+        self.assertEqual(
+            self.parse(FastJSONParser(), content),
+            self.parse(JSONParser(), content),
+        )
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(
+                self.parse(FastJSONParser(), content),
+                self.parse(JSONParser(), content),
+            )
+
+    def test_errors_match_json_parser(self):
+        for content in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError) as expected:
+                self.parse(JSONParser(), content)
+            with self.assertRaises(ParseError) as error:
+                self.parse(FastJSONParser(), content)
+            self.assertEqual(
+                str(error.exception.detail), str(expected.exception.detail)
+            )
+
+    def test_other_encodings_use_json_parser(self):
+        content = '{"name": "Имя"}'.encode("utf-16")
+        self.assertEqual(
+            self.parse(FastJSONParser(), content, "utf-16"), {"name": "Имя"}
+        )
+
+
+class BenchRenderersTests(TestCase):
+    def test_payloads_are_compared(self):
+        out = io.StringIO()
+        call_command(
+            "bench_renderers", "--clients", "2", "--plans", "1",
+            "--days", "2", "--repeat", "1", stdout=out,
+        )
+        self.assertIn("TrainingPlanSerializer", out.getvalue())
@@ -0,0 +1,69 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+import io
+import json
+import os
+import tempfile
+
+from api.schema import get_code_version, get_schema_document, read_schema
+
+
+class SchemaViewTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "openapi.json")
+        settings_override = override_settings(SCHEMA_FILE=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_schema_document.cache_clear()
+        self.addCleanup(get_schema_document.cache_clear)
+
+    def test_schema_is_generated_once_and_served_with_etag(self):
+        response = self.client.get("/api/schema/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(read_schema(self.path))
+        dynamic = self.client.get("/api/schema/?lang=ru")
+        self.assertEqual(response.content, dynamic.content)
+        self.assertNotIn("ETag", dynamic)
+
+        cached = self.client.get(
+            "/api/schema/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+        json_response = self.client.get("/api/schema/?format=json")
+        paths = json.loads(json_response.content)["paths"]
+        self.assertIn("/api/clients/", paths)
+        components = json.loads(json_response.content)["components"]
+        self.assertIn("jwtAuth", components["securitySchemes"])
+        self.assertEqual(
+            paths["/api/clients/"]["get"]["security"], [{"jwtAuth": []}]
+        )
+        self.assertNotEqual(json_response["ETag"], response["ETag"])
+
+    def test_stale_file_is_regenerated(self):
+        with open(self.path, "w") as file:
+            json.dump({"version": "old", "content": {"yaml": "stale"}}, file)
+        response = self.client.get("/api/schema/")
+        self.assertNotEqual(response.content, b"stale")
+        with open(self.path) as file:
+            self.assertEqual(json.load(file)["version"], get_code_version())
+
+    def test_generate_schema_command(self):
+        call_command("generate_schema", "--file", self.path,
+                     stdout=io.StringIO())
+        artifact = read_schema(self.path)
+        self.assertIn("openapi:", artifact["content"]["yaml"])
+        self.client.get("/api/schema/")
+        self.assertEqual(read_schema(self.path), artifact)
+
+    def test_server_mode_changes_version(self):
+        self.addCleanup(get_code_version.cache_clear)
+        version = get_code_version()
+        with open(self.path, "w") as file:
+            json.dump({"version": version, "content": {}}, file)
+        get_code_version.cache_clear()
+        with override_settings(SERVER_MODE="asgi", ASYNC_READ_VIEWS=True):
+            self.assertNotEqual(get_code_version(), version)
+            self.assertIsNone(read_schema(self.path))
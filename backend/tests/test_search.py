@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import ProductViewSet
+from unittest import skipUnless
+
+from diets.models import Products
+from diets.search import search
+
+User = get_user_model()
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="specialist@test.com")
+        for name in ("Гречневая каша", "Гречка", "Рис", "Каша овсяная"):
+            Products.objects.create(
+                name=name, kkal=100, protein=1, carbo=1, fat=1, describe=""
+            )
+
+    def search(self, url):
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=self.user)
+        response = ProductViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def names(self, response):
+        return [product["name"] for product in response.data["results"]]
+
+    def test_prefix_matches_are_ranked_first(self):
+        response = self.search("/api/products/?search=греч")
+        self.assertEqual(self.names(response), ["Гречка", "Гречневая каша"])
+        response = self.search("/api/products/?search=каша")
+        self.assertEqual(
+            self.names(response), ["Каша овсяная", "Гречневая каша"]
+        )
+
+    def test_results_are_paginated(self):
+        response = self.search("/api/products/?page_size=3")
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.search(response.data["next"])
+        self.assertEqual(self.names(response), ["Рис"])
+        self.assertIsNone(response.data["next"])
+
+    @skipUnless(connection.vendor == "postgresql", "триграммный индекс")
+    def test_postgres_filter_matches_trigram_index(self):
+        sql = str(search(Products.objects.all(), "5%_каша").query)
+        self.assertIn('"diets_products"."name" ILIKE', sql)
+        self.assertNotIn('UPPER("diets_products"."name"::text) LIKE', sql)
+        self.assertEqual(
+            self.names(self.search("/api/products/?search=ечнев")),
+            ["Гречневая каша"],
+        )
@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+import time
+
+from api.throttling import IPRateThrottle
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+User = get_user_model()
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        self.request = Request(APIRequestFactory().post("/"))
+        self.view = mock.Mock(throttle_scope="password")
+
+    def allow(self):
+        throttle = IPRateThrottle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, self.view), throttle
+
+    def test_bucket_refills_over_period(self):
+        for _ in range(5):
+            self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 12)
+        self.now += 12
+        self.assertTrue(self.allow()[0])
+        self.assertFalse(self.allow()[0])
+
+    def test_concurrent_requests_do_not_exceed_rate(self):
+        get = LocMemCache.get
+
+        def slow_get(self, *args, **kwargs):
+            # Задерживает запись корзины после чтения: без блокировки
+            # все потоки успевают прочитать полную корзину
+            try:
+                return get(self, *args, **kwargs)
+            finally:
+                time.sleep(0.02)
+
+        # Ожидание блокировки не должно истекать из-за задержки чтения
+        lock_attempts = mock.patch.object(
+            IPRateThrottle, "lock_attempts", 1000
+        )
+        with mock.patch.object(LocMemCache, "get", slow_get), lock_attempts:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                results = list(executor.map(
+                    lambda _: IPRateThrottle().allow_request(
+                        self.request, self.view
+                    ),
+                    range(10),
+                ))
+        self.assertEqual(results.count(True), 5)
+
+    def test_views_without_scope_are_not_throttled(self):
+        self.view.throttle_scope = None
+        for _ in range(10):
+            self.assertTrue(self.allow()[0])
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class AuthThrottlingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="client@test.com", password="testpassword"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_rejected_before_password_check(self):
+        data = {"email": "client@test.com", "password": "wrong"}
+        with mock.patch.object(
+            User, "check_password", return_value=False
+        ) as check_password:
+            for _ in range(5):
+                response = self.client.post(
+                    "/api/users/user_restore/", data
+                )
+                self.assertEqual(response.status_code, 400)
+            response = self.client.post("/api/users/user_restore/", data)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
+        self.assertEqual(check_password.call_count, 5)
+
+    def test_login_limited_per_email_across_addresses(self):
+        data = {"email": "Client@test.com ", "password": "wrong"}
+        for number in range(10):
+            response = self.client.post(
+                "/api/auth/jwt/create/", data,
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{number}",
+            )
+            self.assertEqual(response.status_code, 401)
+        response = self.client.post(
+            "/api/auth/jwt/create/",
+            {"email": "client@test.com", "password": "testpassword"},
+            HTTP_X_FORWARDED_FOR="10.0.1.1",
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        response = self.client.post(
+            "/api/auth/jwt/create/",
+            {"email": "other@test.com", "password": "wrong"},
+            HTTP_X_FORWARDED_FOR="10.0.1.1",
+        )
+        self.assertEqual(response.status_code, 401)
@@ -71,12 +71,12 @@ class ClientsViewSetTests(TestCase):
         )
 
     def setUp(self):
-        self.client = Client()
-        self.client.force_login(ClientsViewSetTests.specialist)
+        access = get_tokens_for_user(ClientsViewSetTests.specialist)["access"]
+        self.client = Client(HTTP_AUTHORIZATION=f"JWT {access}")
         self.factory = APIRequestFactory()
         cache.clear()
 
-    def test_api_client_create(self):
+    def post_client(self):
         request = self.factory.post(
             "/api/clients/",
             data={
@@ -107,9 +107,23 @@ class ClientsViewSetTests(TestCase):
         )
         view = ClientsViewSet.as_view({"get": "detail", "post": "create"})
         force_authenticate(request, user=ClientsViewSetTests.specialist)
-        response = view(request)
+        return view(request)
+
+    def test_api_client_create(self):
+        response = self.post_client()
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(SpecialistClient.objects.count(), 2)
+        client = User.objects.get(email="user@exa.com")
+        self.assertEqual(client.current_params, client.params.get())
+        self.assertEqual(
+            response.data["user"]["params"]["waist_size"], 0
+        )
+
+    def test_api_client_create_twice(self):
+        self.post_client()
+        response = self.post_client()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SpecialistClient.objects.count(), 2)
 
     def test_api_client_patch(self):
         request = self.factory.patch(
@@ -195,7 +209,9 @@ class ClientsViewSetTests(TestCase):
         force_authenticate(request, user=ClientsViewSetTests.specialist)
         response = view(request)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data[0]["name"], "first plan, obviously")
+        self.assertEqual(
+            response.data["results"][0]["name"], "first plan, obviously"
+        )
 
     def test_api_training_plans_get_error_without_user_query(self):
         request = self.factory.get(
@@ -273,4 +289,4 @@ class ClientsViewSetTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Assuming only one client for this specialist
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
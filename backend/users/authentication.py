@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.db import router
+from rest_framework.exceptions import AuthenticationFailed
+
+import uuid
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import TOKEN_VERSION_CLAIM, check_token_version
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT без чтения пользователя из БД.
+
+    Пользователь собирается из claims токена: загружены id, права и
+    версия токенов, остальные поля отложены и читаются одним запросом
+    при первом обращении к любому из них. Для токенов без claims
+    пользователь читается из БД, как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        check_token_version(validated_token)
+        if not validated_token.get("is_active"):
+            raise AuthenticationFailed(
+                "Пользователь заблокирован", "user_inactive"
+            )
+        return self.build_user(validated_token)
+
+    def build_user(self, validated_token):
+        try:
+            values = {
+                "id": uuid.UUID(validated_token[api_settings.USER_ID_CLAIM]),
+                TOKEN_VERSION_CLAIM: validated_token[TOKEN_VERSION_CLAIM],
+            }
+            user_model = get_user_model()
+            for name in user_model.CLAIM_FIELDS:
+                values[name] = bool(validated_token[name])
+        except (KeyError, ValueError):
+            raise InvalidToken("Неполные claims пользователя")
+        names = [
+            field.attname
+            for field in user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return user_model.from_db(
+            router.db_for_read(user_model),
+            names,
+            [values[name] for name in names],
+        )
@@ -4,10 +4,11 @@ from django.conf import settings
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin,)
 from django.core.validators import MinLengthValidator, RegexValidator
-from django.db.models import (PROTECT, BooleanField, CharField, DateField,
-                              DateTimeField, EmailField, FloatField,
-                              ForeignKey, ImageField, IntegerField, Model,
-                              TextField, UUIDField,)
+from django.db.models import (PROTECT, SET_NULL, BooleanField, CharField,
+                              DateField, DateTimeField, EmailField, FloatField,
+                              ForeignKey, ImageField, Index, IntegerField,
+                              Model, PositiveIntegerField, TextField,
+                              UniqueConstraint, UUIDField,)
 
 import uuid
 
@@ -210,6 +211,23 @@ class User(PermissionsMixin, AbstractBaseUser):
         null=True,
         blank=True,
     )
+    current_params = ForeignKey(
+        'Params',
+        on_delete=SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Текущие параметры',
+        help_text='Последняя запись Params, обновляется автоматически',
+    )
+    token_version = PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов',
+        help_text='Растет при смене прав, выданные ранее JWT перестают '
+                  'приниматься',
+    )
     created_at = DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания',
@@ -225,10 +243,73 @@ class User(PermissionsMixin, AbstractBaseUser):
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+        indexes = [
+            Index(
+                fields=['-created_at', '-id'],
+                name='users_user_created_idx',
+            ),
+        ]
+
+    # Поля, которые копируются в JWT (см. users.tokens)
+    CLAIM_FIELDS = ('is_specialist', 'is_superuser', 'is_staff', 'is_active')
 
     def __str__(self):
         return f'User: {self.email}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_claims = instance.get_claims()
+        return instance
+
+    def get_claims(self):
+        # Через __dict__, чтобы не загружать отложенные поля
+        return {
+            name: self.__dict__[name]
+            for name in self.CLAIM_FIELDS
+            if name in self.__dict__
+        }
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Обращение к одному отложенному полю загружает сразу все
+        # отложенные: пользователь из claims JWT (users.authentication)
+        # иначе читался бы по одному полю за запрос.
+        if fields is not None:
+            fields = set(fields)
+            deferred = self.get_deferred_fields()
+            if deferred.issuperset(fields):
+                fields = deferred
+        super().refresh_from_db(using, fields, **kwargs)
+        self.remember_claims(fields)
+
+    def remember_claims(self, fields=None):
+        """Запоминание значений claims, совпадающих с БД."""
+        claims = self.get_claims()
+        if fields is not None:
+            claims = {
+                name: value for name, value in claims.items()
+                if name in fields
+            }
+        self.loaded_claims = {**getattr(self, 'loaded_claims', {}), **claims}
+
+    def save(self, *args, **kwargs):
+        # При смене прав растет token_version, выданные JWT отзываются
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        loaded = getattr(self, 'loaded_claims', {})
+        self.claims_changed = not self._state.adding and any(
+            name not in loaded or loaded[name] != value
+            for name, value in self.get_claims().items()
+            if update_fields is None or name in update_fields
+        )
+        if self.claims_changed:
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self.remember_claims(update_fields)
+
 
 class Params(Model):
     id = UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -247,7 +328,9 @@ class Params(Model):
         on_delete=PROTECT,
         blank=True,
         null=True,
-        related_name='params'
+        related_name='params',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
     )
     waist_size = IntegerField(
         verbose_name='Размер талии',
@@ -263,6 +346,12 @@ class Params(Model):
         ordering = ['-created_at']
         verbose_name = 'Параметр'
         verbose_name_plural = 'Параметры'
+        indexes = [
+            Index(
+                fields=['user', '-created_at', '-id'],
+                name='users_params_user_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.weight} kg, {self.height} cm'
@@ -320,6 +409,8 @@ class SpecialistClient(Model):
         blank=True,
         null=True,
         related_name='specialist_client_spec',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
     )
     user = ForeignKey(
         User,
@@ -370,6 +461,18 @@ class SpecialistClient(Model):
     class Meta:
         verbose_name = 'Специалист-Клиент'
         verbose_name_plural = 'Специалисты-Клиенты'
+        constraints = [
+            UniqueConstraint(
+                fields=['specialist', 'user'],
+                name='unique_specialist_client',
+            ),
+        ]
+        indexes = [
+            Index(
+                fields=['specialist', '-created_at', '-id'],
+                name='users_sc_spec_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.specialist.email} - {self.user.email}'
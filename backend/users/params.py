@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Trunc
+
+from .models import Params
+
+User = get_user_model()
+
+
+def refresh_current_params(*user_ids):
+    """Пересчет User.current_params по последней записи Params.
+
+    Выполняется одним UPDATE с подзапросом по индексу
+    (user, -created_at). Нужен после bulk_create и других массовых
+    операций с Params, для которых сигналы не отправляются.
+    """
+    User.objects.filter(pk__in=user_ids).update(
+        current_params=Subquery(
+            Params.objects.filter(user=OuterRef("pk"))
+            .order_by("-created_at", "-pk")
+            .values("pk")[:1]
+        )
+    )
+
+
+SERIES_METRICS = ("weight", "height", "waist_size")
+SERIES_PERIODS = ("day", "week", "month")
+
+
+def get_params_series(user_id, metric, period, date_from=None, date_to=None):
+    """Значения параметра, агрегированные в БД по дням/неделям/месяцам.
+
+    Возвращает список словарей bucket/avg/min/max/count в порядке
+    возрастания даты, пустые периоды не попадают в выборку.
+    """
+    queryset = Params.objects.filter(
+        user_id=user_id, **{f"{metric}__isnull": False}
+    )
+    if date_from:
+        queryset = queryset.filter(created_at__date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(created_at__date__lte=date_to)
+    return list(
+        queryset.annotate(bucket=Trunc("created_at", period))
+        .values("bucket")
+        .annotate(
+            avg=Avg(metric),
+            min=Min(metric),
+            max=Max(metric),
+            count=Count("pk"),
+        )
+        .order_by("bucket")
+    )
+
+
+def downsample(points, threshold):
+    """Прореживание ряда алгоритмом LTTB до threshold точек.
+
+    Ряд делится на threshold - 2 корзины, из каждой берется точка,
+    образующая треугольник наибольшей площади с предыдущей выбранной
+    точкой и средним следующей корзины. Крайние точки сохраняются,
+    поэтому форма графика (пики и провалы) не теряется.
+    """
+    if threshold < 3 or len(points) <= threshold:
+        return points
+    x = [point["bucket"].timestamp() for point in points]
+    y = [point["avg"] for point in points]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    sampled = [points[0]]
+    selected = 0
+    for number in range(threshold - 2):
+        start = int(number * bucket_size) + 1
+        end = int((number + 1) * bucket_size) + 1
+        next_end = max(
+            min(int((number + 2) * bucket_size) + 1, len(points)), end + 1
+        )
+        next_x = sum(x[end:next_end]) / (next_end - end)
+        next_y = sum(y[end:next_end]) / (next_end - end)
+        best, best_area = start, -1
+        for index in range(start, end):
+            area = abs(
+                (x[selected] - next_x) * (y[index] - y[selected])
+                - (x[selected] - x[index]) * (next_y - y[selected])
+            )
+            if area > best_area:
+                best, best_area = index, area
+        sampled.append(points[best])
+        selected = best
+    sampled.append(points[-1])
+    return sampled
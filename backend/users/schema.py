@@ -0,0 +1,11 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Схема jwtAuth для ClaimsJWTAuthentication.
+
+    Расширения drf_spectacular не применяются к наследникам
+    JWTAuthentication, без него в схеме нет securitySchemes.
+    """
+
+    target_class = 'users.authentication.ClaimsJWTAuthentication'
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Params, User
+from .params import refresh_current_params
+from .tokens import invalidate_token_versions
+
+
+@receiver(pre_save, sender=Params)
+def remember_previous_user(sender, instance, **kwargs):
+    """Запоминаем прежнего владельца, если запись переназначают."""
+    if instance._state.adding:
+        return
+    instance.previous_user_id = (
+        Params.objects.filter(pk=instance.pk)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Params)
+@receiver(post_delete, sender=Params)
+def update_current_params(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_ids = {
+        instance.user_id, getattr(instance, "previous_user_id", None)
+    } - {None}
+    if user_ids:
+        refresh_current_params(*user_ids)
+    if kwargs.get("created") and Params.user.is_cached(instance):
+        instance.user.current_params = instance
+
+
+@receiver(post_save, sender=User)
+def invalidate_token_version(sender, instance, created, **kwargs):
+    """Сброс закэшированной версии токенов после смены прав."""
+    if getattr(instance, "claims_changed", False):
+        invalidate_token_versions(instance.pk)
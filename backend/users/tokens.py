@@ -0,0 +1,107 @@
+"""JWT с правами пользователя в claims.
+
+В токен при выдаче копируются поля User.CLAIM_FIELDS и версия токенов
+пользователя. ClaimsJWTAuthentication собирает пользователя из claims
+без запроса к БД и сверяет только версию, которая хранится в кэше.
+Смена прав или блокировка увеличивают User.token_version, после чего
+выданные ранее токены (и их обновление) отклоняются.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (TokenObtainPairSerializer,
+                                                  TokenRefreshSerializer,)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+TOKEN_VERSION_CLAIM = "token_version"
+TOKEN_VERSION_KEY = "user_token_version:{}"
+TOKEN_VERSION_TIMEOUT = 60 * 60
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя, None если его нет.
+
+    При промахе кэш заполняется одним запросом к User.
+    """
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            get_user_model().objects.filter(pk=user_id)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is not None:
+            cache.set(key, version, TOKEN_VERSION_TIMEOUT)
+    return version
+
+
+def invalidate_token_versions(*user_ids):
+    """Сброс версий из кэша, повторяется после коммита.
+
+    Иначе параллельный запрос успел бы закэшировать версию из
+    незавершенной транзакции.
+    """
+    keys = [TOKEN_VERSION_KEY.format(user_id) for user_id in user_ids]
+
+    def invalidate():
+        cache.delete_many(keys)
+
+    if keys:
+        invalidate()
+        transaction.on_commit(invalidate)
+
+
+def check_token_version(token):
+    """Отклонение токена, выданного до смены прав пользователя.
+
+    Токены без claim версии (выданные до включения claims)
+    не проверяются, пользователь для них читается из БД.
+    """
+    if TOKEN_VERSION_CLAIM not in token:
+        return
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    version = get_token_version(user_id)
+    if version is None:
+        raise AuthenticationFailed("Пользователь не найден", "user_not_found")
+    if version != token[TOKEN_VERSION_CLAIM]:
+        raise InvalidToken("Права пользователя изменились, войдите заново")
+
+
+class UserClaimsMixin:
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for name in user.CLAIM_FIELDS:
+            token[name] = bool(getattr(user, name))
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class ClaimsAccessToken(UserClaimsMixin, AccessToken):
+    """Access token с правами пользователя в claims."""
+
+
+class ClaimsRefreshToken(UserClaimsMixin, RefreshToken):
+    """Refresh token с правами пользователя в claims.
+
+    Claims копируются в access token при каждом обновлении.
+    """
+
+    access_token_class = ClaimsAccessToken
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        check_token_version(self.token_class(attrs["refresh"]))
+        return super().validate(attrs)
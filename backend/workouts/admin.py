@@ -1,7 +1,7 @@
 from django.contrib import admin
 
-from .models import (Exercise, ExercisesList, Training, TrainingExercisesList,
-                     TrainingPlan, TrainingType,)
+from .models import (Exercise, ExercisesList, MuscleGroup, Training,
+                     TrainingExercisesList, TrainingPlan, TrainingType,)
 
 admin.site.register(Exercise)
 admin.site.register(Training)
@@ -9,3 +9,4 @@ admin.site.register(TrainingPlan)
 admin.site.register(TrainingType)
 admin.site.register(TrainingExercisesList)
 admin.site.register(ExercisesList)
+admin.site.register(MuscleGroup)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class WorkoutsConfig(AppConfig):
     name = 'workouts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,214 @@
+"""Каталог упражнений в памяти процесса.
+
+Каталог меняется редко, поэтому он целиком загружается из БД и
+хранится в памяти процесса вместе с инвертированными индексами
+«группа мышц -> упражнения» и «тип тренировки -> упражнения».
+Актуальность проверяется по метке версии в общем кэше, которую
+сигналы меняют при любом изменении упражнений, групп мышц и типов
+тренировок, так что запрос к каталогу не обращается к БД.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+import re
+import threading
+import uuid
+
+from .models import Exercise, ExerciseMuscleGroup, MuscleGroup, TrainingType
+
+CATALOG_VERSION_KEY = "exercise_catalog_version"
+MUSCLES_SEPARATORS = re.compile(r"[,;/\n]+")
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def parse_muscles(text):
+    """Список нормализованных названий мышц из свободного текста."""
+    names = []
+    for name in MUSCLES_SEPARATORS.split(text or ""):
+        name = " ".join(name.split()).lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_exercise_muscle_groups(exercise):
+    """Пересоздание связей упражнения с группами мышц по его тексту."""
+    sync_muscle_groups([exercise])
+
+
+def sync_muscle_groups(exercises):
+    """Пересоздание связей упражнений с группами мышц по их тексту.
+
+    Группы, на которые больше не ссылается ни одно упражнение,
+    удаляются.
+    """
+    muscles = {
+        exercise.pk: (
+            parse_muscles(exercise.target_muscles),
+            parse_muscles(exercise.auxiliary_muscles),
+        )
+        for exercise in exercises
+    }
+    names = {
+        name
+        for target, auxiliary in muscles.values()
+        for name in (*target, *auxiliary)
+    }
+    MuscleGroup.objects.bulk_create(
+        [MuscleGroup(name=name) for name in names], ignore_conflicts=True
+    )
+    groups = dict(
+        MuscleGroup.objects.filter(name__in=names).values_list("name", "pk")
+    )
+    ExerciseMuscleGroup.objects.filter(exercise_id__in=muscles).delete()
+    ExerciseMuscleGroup.objects.bulk_create(
+        [
+            ExerciseMuscleGroup(
+                exercise_id=exercise_id,
+                muscle_group_id=groups[name],
+                is_target=is_target,
+            )
+            for exercise_id, (target, auxiliary) in muscles.items()
+            for names, is_target in ((target, True), (auxiliary, False))
+            for name in names
+        ]
+    )
+    delete_unused_muscle_groups()
+
+
+def sync_all_muscle_groups(batch_size=500):
+    """Связи всех упражнений с группами мышц, возвращает их число.
+
+    Заполняет связи для упражнений, созданных до появления
+    ExerciseMuscleGroup, для которых сигнал post_save не срабатывал.
+    """
+    exercises = Exercise.objects.only(
+        "target_muscles", "auxiliary_muscles"
+    ).order_by("pk")
+    count = 0
+    batch = []
+    for exercise in exercises.iterator(chunk_size=batch_size):
+        batch.append(exercise)
+        count += 1
+        if len(batch) == batch_size:
+            sync_muscle_groups(batch)
+            batch = []
+    # Последняя часть, группы без упражнений удаляются и при пустой
+    sync_muscle_groups(batch)
+    return count
+
+
+def delete_unused_muscle_groups():
+    MuscleGroup.objects.filter(exercise_muscle_groups__isnull=True).delete()
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is not None:
+        return version
+    cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+    return cache.get(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    def bump():
+        cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class ExerciseCatalog:
+    """Снимок каталога упражнений с инвертированными индексами."""
+
+    def __init__(self, version):
+        self.version = version
+        self.exercises = {}
+        self.by_muscle = {True: {}, False: {}}
+        self.by_type = {}
+        self.training_types = list(
+            TrainingType.objects.order_by("name").values(
+                "id", "name", "describe"
+            )
+        )
+        self.muscle_groups = list(
+            MuscleGroup.objects.order_by("name").values("id", "name")
+        )
+        links = ExerciseMuscleGroup.objects.select_related("muscle_group")
+        muscles = {}
+        for link in links:
+            muscles.setdefault(link.exercise_id, []).append(link)
+            self.by_muscle[link.is_target].setdefault(
+                link.muscle_group.name, set()
+            ).add(link.exercise_id)
+        for exercise in Exercise.objects.select_related(
+            "training_type"
+        ).order_by("name", "pk"):
+            exercise_muscles = muscles.get(exercise.pk, [])
+            self.exercises[exercise.pk] = {
+                "id": exercise.pk,
+                "name": exercise.name,
+                "photo": exercise.photo.url if exercise.photo else None,
+                "describe": exercise.describe,
+                "link": exercise.link,
+                "training_type": exercise.training_type
+                and {
+                    "id": exercise.training_type.pk,
+                    "name": exercise.training_type.name,
+                },
+                "target_muscles": [
+                    link.muscle_group.name
+                    for link in exercise_muscles
+                    if link.is_target
+                ],
+                "auxiliary_muscles": [
+                    link.muscle_group.name
+                    for link in exercise_muscles
+                    if not link.is_target
+                ],
+            }
+            self.by_type.setdefault(exercise.training_type_id, set()).add(
+                exercise.pk
+            )
+
+    def muscle_exercises(self, muscle, role=None):
+        muscle = " ".join(muscle.split()).lower()
+        roles = (True, False) if role is None else (role,)
+        return set().union(
+            *(self.by_muscle[is_target].get(muscle, set())
+              for is_target in roles)
+        )
+
+    def filter(self, muscles=(), role=None, training_type=None, search=""):
+        """Упражнения, задействующие все muscles, в порядке названий."""
+        ids = None
+        for muscle in muscles:
+            found = self.muscle_exercises(muscle, role)
+            ids = found if ids is None else ids & found
+        if training_type is not None:
+            found = self.by_type.get(training_type, set())
+            ids = found if ids is None else ids & found
+        search = search.strip().lower()
+        return [
+            exercise
+            for pk, exercise in self.exercises.items()
+            if (ids is None or pk in ids)
+            and (not search or search in exercise["name"].lower())
+        ]
+
+
+def load_catalog(version):
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = ExerciseCatalog(version)
+
+
+def get_catalog():
+    """Актуальный каталог, при смене версии загружается заново."""
+    version = get_catalog_version()
+    if _catalog is None or _catalog.version != version:
+        load_catalog(version)
+    return _catalog
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workouts.catalog import sync_all_muscle_groups
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересоздание связей упражнений с группами мышц по тексту "
+        "упражнений и удаление групп без упражнений"
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = sync_all_muscle_groups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Группы мышц обновлены, упражнений: {count}."
+        ))
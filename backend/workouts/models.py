@@ -5,6 +5,23 @@ from django.db import models
 User = get_user_model()
 
 
+class MuscleGroup(models.Model):
+    name = models.CharField(
+        max_length=settings.OTHER_MAX_LENGTH,
+        unique=True,
+        verbose_name='Название группы мышц',
+        help_text='Название группы мышц в нижнем регистре',
+    )
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Группа мышц'
+        verbose_name_plural = 'Группы мышц'
+
+    def __str__(self):
+        return self.name
+
+
 class Exercise(models.Model):
     name = models.CharField(
         max_length=settings.OTHER_MAX_LENGTH,
@@ -44,6 +61,23 @@ class Exercise(models.Model):
         verbose_name='Ссылка на видео выполнения упражнения',
         help_text='Введите ссылку на видео выполнения упражнения',
     )
+    training_type = models.ForeignKey(
+        'TrainingType',
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        verbose_name='Тип тренировки',
+        help_text='Выберите тип тренировки',
+        related_name='exercises',
+    )
+    muscle_groups = models.ManyToManyField(
+        MuscleGroup,
+        blank=True,
+        through='ExerciseMuscleGroup',
+        verbose_name='Группы мышц',
+        help_text='Заполняется из целевых и вспомогательных мышц',
+        related_name='exercises',
+    )
     create_dt = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания упражнения',
@@ -64,6 +98,44 @@ class Exercise(models.Model):
         return self.name
 
 
+class ExerciseMuscleGroup(models.Model):
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name='exercise_muscle_groups',
+        verbose_name='Упражнение',
+    )
+    muscle_group = models.ForeignKey(
+        MuscleGroup,
+        on_delete=models.CASCADE,
+        related_name='exercise_muscle_groups',
+        verbose_name='Группа мышц',
+    )
+    is_target = models.BooleanField(
+        default=True,
+        verbose_name='Целевая группа мышц',
+    )
+
+    class Meta:
+        verbose_name = 'Связь упражнения с группой мышц'
+        verbose_name_plural = 'Связи упражнений с группами мышц'
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_exercise_muscle_group',
+                fields=['exercise', 'muscle_group', 'is_target'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['muscle_group', 'is_target'],
+                name='workouts_emg_muscle_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.exercise} {self.muscle_group}'
+
+
 class TrainingType(models.Model):
     name = models.CharField(
         max_length=settings.OTHER_MAX_LENGTH,
@@ -212,7 +284,9 @@ class TrainingPlan(models.Model):
         # null=True,
         verbose_name='Специалист',
         help_text='Специалист',
-        related_name='spec_training_plan'
+        related_name='spec_training_plan',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
     )
     user = models.ForeignKey(
         User,
@@ -220,7 +294,9 @@ class TrainingPlan(models.Model):
         on_delete=models.CASCADE,
         # null=True,
         help_text='Клиент',
-        related_name='user_training_plan'
+        related_name='user_training_plan',
+        # Поиск по FK обслуживает составной индекс из Meta.indexes
+        db_index=False,
     )
     name = models.CharField(
         max_length=settings.OTHER_MAX_LENGTH,
@@ -279,6 +355,16 @@ class TrainingPlan(models.Model):
         ordering = ['-create_dt']
         verbose_name = 'План тренировки'
         verbose_name_plural = 'Планы тренировок'
+        indexes = [
+            models.Index(
+                fields=['user', '-create_dt', '-id'],
+                name='workouts_tp_user_create_idx',
+            ),
+            models.Index(
+                fields=['specialist', '-create_dt', '-id'],
+                name='workouts_tp_spec_create_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
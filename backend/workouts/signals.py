@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import (bump_catalog_version, delete_unused_muscle_groups,
+                      sync_exercise_muscle_groups,)
+from .models import Exercise, ExerciseMuscleGroup, MuscleGroup, TrainingType
+
+
+@receiver(post_save, sender=Exercise)
+def sync_muscle_groups(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_exercise_muscle_groups(instance)
+
+
+@receiver(post_delete, sender=Exercise)
+def delete_muscle_groups(sender, instance, **kwargs):
+    delete_unused_muscle_groups()
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+@receiver(post_save, sender=MuscleGroup)
+@receiver(post_delete, sender=MuscleGroup)
+@receiver(post_save, sender=ExerciseMuscleGroup)
+@receiver(post_delete, sender=ExerciseMuscleGroup)
+@receiver(post_save, sender=TrainingType)
+@receiver(post_delete, sender=TrainingType)
+def invalidate_exercise_catalog(sender, **kwargs):
+    bump_catalog_version()